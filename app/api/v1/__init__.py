@@ -1 +1 @@
-__all__ = ['auth', 'chat']
+__all__ = ['auth', 'chat', 'documents', 'embeddings']
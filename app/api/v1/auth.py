@@ -16,8 +16,8 @@ security = HTTPBearer()
     summary="Register a new user",
     description="Register a new user with a unique username and a password",
 )
-def register(user_request: RegistrationRequest):
-    return register_user(user_request.username, user_request.email, user_request.password, user_request.confirm_password)
+async def register(user_request: RegistrationRequest):
+    return await register_user(user_request.username, user_request.email, user_request.password, user_request.confirm_password)
 
 
 @router.post(
@@ -27,8 +27,8 @@ def register(user_request: RegistrationRequest):
     summary="Login a user",
     description="Login a user with a valid username and password",
 )
-def login(user_request: LoginCredentials):
-    return login_user(user_request.username, user_request.password)
+async def login(user_request: LoginCredentials):
+    return await login_user(user_request.username, user_request.password)
 
 
 @router.get(
@@ -38,8 +38,8 @@ def login(user_request: LoginCredentials):
     summary="Get authenticated user",
     description="Get details of the currently authenticated user details by token"
 )
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    return get_user(credentials.credentials)
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await get_user(credentials.credentials)
 
 
 @router.post('/logout',
@@ -47,11 +47,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     summary="Logout a user",
     description="Logout a user"
 )
-def logout(
+async def logout(
     access_token: str = Body(..., description="Access token", example="eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."),
     refresh_token: str = Body(..., description="Refresh token", example="eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...")
 ):
-    return logout_user(access_token=access_token, refresh_token=refresh_token)
+    return await logout_user(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post(
@@ -61,7 +61,7 @@ def logout(
     summary="Refresh access token",
     description="Refresh the access token using the refresh token",
 )
-def refresh_token(
+async def refresh_token(
     refresh_token: str = Body(..., description="Refresh token", example="eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...")
 ):
-    return refresh_user_access_token(refresh_token)
\ No newline at end of file
+    return await refresh_user_access_token(refresh_token)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import asyncio
 import logging
-from typing import Annotated, Optional
-from fastapi import APIRouter, Body, Depends, WebSocket, WebSocketDisconnect, status
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect, status
 
 from app.services.chat_service import (
     create_chat_completion,
@@ -10,8 +10,10 @@ from app.services.chat_service import (
     get_user_chats_collection,
     delete_chat_conversation,
     get_available_models,
+    get_scheduler_stats,
     rename_chat_conversation,
 )
+from app.services.search_service import search_chats
 from app.models.chat import (
     AvailableModelsResponse,
     ChatCompletionRequest,
@@ -19,12 +21,18 @@ from app.models.chat import (
     ChatConversation,
     UserChatsCollection,
     ChatRenameResponse,
+    SchedulerStatsResponse,
+    ChatSearchResponse,
 )
 from app.config import settings
 from app.middlewares.auth import get_current_user, get_current_user_optional, get_current_user_ws
+from app.services.metrics_service import Gauge
+from app.services.model_registry_service import model_registry
+from app.utils import FrameWriter, negotiate_frame_mode
 
 
 router = APIRouter(prefix="/api/v1/chat", tags=["Chat"])
+websocket_connections = Gauge("websocket_connections_active", "Open chat WebSocket connections")
 
 
 @router.websocket("/ws")
@@ -38,60 +46,99 @@ async def chat_stream(
 
     This endpoint allows clients to establish a WebSocket connection for interactive chat sessions.
     The client may optionally authenticate by providing a JWT token (as a query parameter or header).
-    Once connected, the server will send a `{"status": "connected"}` message.
+    Once connected, the server will send a `{"status": "connected", "frames": ...}` message.
+
+    **Frame modes:**
+    The `frames` query parameter selects how server events are encoded:
+    - `json` (default): text frames with JSON objects, as described below.
+    - `msgpack`: binary frames with MessagePack maps (only when msgpack is installed).
+    - `binary`: binary frames whose first byte is the type: `0x01` is followed by the
+      UTF-8 text of a streamed chunk, `0x00` by any other event as UTF-8 JSON.
+    The `connected` event reports the mode in use; unsupported requests fall back to `json`.
+    In `msgpack` and `binary` modes the `complete` event omits `message`, since the
+    client already has the text from the chunks.
 
     **Receiving Data:**
     - The server expects JSON messages from the client with at least a `command` field.
     - Supported commands:
         - `"chat"` (default): Start a new AI response generation. The message should include:
-            - `messages`: List of chat messages (history + new user message).
+            - `messages`: List of chat messages (history + new user message), or
+            - `message`: Only the new user message; with a `chat_id` the stored history is reused.
             - `model` (optional): Model name to use.
             - `chat_id` (optional): Chat session identifier.
+            - `options` (optional): Ollama generation options. With `temperature` 0 and the response
+              cache enabled, known answers are replayed from the cache.
         - `"interrupt"`: Interrupt the current AI response generation.
 
     **Response Data:**
     - On connection: `{"status": "connected"}`
     - On `"chat"` command:
         - Streaming responses: `{"status": "streaming", "chunk": ...}` (multiple times)
-        - On completion: `{"status": "complete", "message": ...}`
+        - On completion: `{"status": "complete", "chat_id": ..., "message": ..., "cached": ...}`
+          (`message` is only sent in `json` mode)
         - On error: `{"status": "error", "message": ...}`
+        - For authenticated users, once the chat is saved in the background:
+          `{"status": "title", "chat_id": ..., "title": ...}` (`title` is null when unchanged)
     - On `"interrupt"` command:
         - `{"status": "interrupted", "content": ...}`
 
-    The server handles only one active generation task per connection. If interrupted, the current task is cancelled.
-    On disconnect, any running generation task is also cancelled.
+    The server handles only one active generation task per connection. If interrupted, the current task is cancelled
+    and the request to Ollama is closed, which stops the generation. On disconnect, any running generation task is
+    also cancelled. Partial answers of authenticated users are saved or dropped according to `STREAM_INTERRUPT_POLICY`.
     """
     await websocket.accept()
+    websocket_connections.inc()
+    writer = FrameWriter(websocket, negotiate_frame_mode(websocket.query_params.get("frames")))
     user_id = user.get("user_id") if user else None
     logging.info(f"WebSocket connected for user: {user_id}")
     current_generation_task = None
+    interrupt_event = None
 
     try:
-        await websocket.send_json({"status": "connected", "message": "WebSocket connected for user: " + str(user_id)})
+        await writer.send({
+            "status": "connected",
+            "message": "WebSocket connected for user: " + str(user_id),
+            "frames": writer.mode,
+        })
 
         while True:
             data = await websocket.receive_json()
             command = data.get("command", "chat")
 
-            logging.info(f"Received command: {command} {data}")
+            logging.info(f"Received command: {command}")
             
             if command == "interrupt":
                 if current_generation_task and not current_generation_task.done():
+                    interrupt_event.set()
                     current_generation_task.cancel()
-                    await websocket.send_json({
+                    # Let the stream unwind first, so no chunk follows the interrupted event
+                    await asyncio.gather(current_generation_task, return_exceptions=True)
+                    await writer.send({
                         "status": "interrupted",
                         "content": "Response generation interrupted"
                     })
                 continue
     
             messages = data.get("messages", [])
+            message = data.get("message")
+            if isinstance(message, str):
+                message = {"role": "user", "content": message}
             model = data.get("model") if data.get("model") else settings.DEFAULT_MODEL
             chat_id = data.get("chat_id")
+            options = data.get("options")
+
+            if not await model_registry.is_known(model):
+                await writer.send({"status": "error", "message": f"Unknown model '{model}'"})
+                continue
             
-            logging.info(f"Starting chat: {chat_id} - {user_id} - {model} - {messages}")
+            logging.info(f"Starting chat: {chat_id} - {user_id} - {model}")
 
+            interrupt_event = asyncio.Event()
             current_generation_task = asyncio.create_task(
-                create_chat_completion_stream(websocket, user_id, chat_id, messages, model)
+                create_chat_completion_stream(
+                    websocket, user_id, chat_id, messages, model, interrupt_event,
+                    message=message, options=options, frame_mode=writer.mode,
+                )
             )
             
     except WebSocketDisconnect:
@@ -99,7 +146,9 @@ async def chat_stream(
         if current_generation_task and not current_generation_task.done():
             current_generation_task.cancel()
     except Exception as e:
-        await websocket.send_json({"status": "error", "message": str(e)})
+        await writer.send({"status": "error", "message": str(e)})
+    finally:
+        websocket_connections.dec()
 
 
 @router.post(
@@ -107,18 +156,37 @@ async def chat_stream(
     response_model=ChatCompletionResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Chat with Ollama",
-    description="Chat with Ollama models to get AI responses. If authenticated, the chat history will be saved to the user's account.",
+    description=(
+        "Chat with Ollama models to get AI responses. If authenticated, the chat history will be saved to the user's account. "
+        "When the response cache is enabled, requests with `options.temperature` 0 are answered from the cache; "
+        "send `Cache-Control: no-cache` or `X-Cache-Bypass: 1` to skip it. The chat is saved in the background; "
+        "on a cache hit `title` is null and the title is set once it has been generated."
+    ),
 )
-def chat(
+async def chat(
     chat_request: ChatCompletionRequest,
+    request: Request,
+    response: Response,
     user: Optional[dict] = Depends(get_current_user_optional),
 ):
     messages = chat_request.messages
+    message = chat_request.message
     model = chat_request.model if chat_request.model else settings.DEFAULT_MODEL
     chat_id = chat_request.chat_id if chat_request.chat_id else None
+    await model_registry.validate(model)
     
     user_id = user["user_id"] if user else None
-    return create_chat_completion(user_id, chat_id, messages, model)
+    cache_control = request.headers.get("cache-control", "").lower()
+    use_cache = not (
+        "no-cache" in cache_control
+        or "no-store" in cache_control
+        or request.headers.get("x-cache-bypass", "").lower() in ("1", "true", "yes")
+    )
+    result = await create_chat_completion(
+        user_id, chat_id, messages, model, message, chat_request.options, use_cache
+    )
+    response.headers["X-Cache"] = "HIT" if result.cached else "MISS"
+    return result
 
 
 @router.get(
@@ -126,10 +194,46 @@ def chat(
     response_model=AvailableModelsResponse,
     status_code=status.HTTP_200_OK,
     summary="Get all models",
-    description="Retrieve a list of all available models from the Ollama service",
+    description="Retrieve a list of all available models from the Ollama service. Supports `If-None-Match` revalidation.",
+)
+async def get_models(request: Request, response: Response, user: dict = Depends(get_current_user)):
+    models = await get_available_models()
+    etag = model_registry.etag
+    if etag:
+        if etag in (tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return models
+
+
+@router.get(
+    "/queue",
+    response_model=SchedulerStatsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get generation queue stats",
+    description="Retrieve queue depth and wait times of the per-model generation scheduler",
+)
+async def get_queue_stats(user: dict = Depends(get_current_user)):
+    return get_scheduler_stats()
+
+
+@router.get(
+    "/search",
+    response_model=ChatSearchResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Search chats",
+    description=(
+        "Search the current user's chats by title and message content. `text` mode ranks keyword matches "
+        "with the MongoDB text index; `semantic` mode, when enabled, ranks messages by embedding similarity."
+    ),
 )
-def get_models(user: dict = Depends(get_current_user)):
-    return get_available_models()
+async def search(
+    q: str = Query(..., min_length=1, max_length=500, description="Search query"),
+    mode: Literal["text", "semantic"] = Query("text", description="Search mode"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of chats to return"),
+    user: dict = Depends(get_current_user),
+):
+    return await search_chats(user["user_id"], q, mode, limit)
 
 
 @router.get(
@@ -137,21 +241,38 @@ def get_models(user: dict = Depends(get_current_user)):
     response_model=ChatConversation,
     status_code=status.HTTP_200_OK,
     summary="Get chat section",
-    description="Get chat section by chat_id for the current user",
+    description=(
+        "Get chat section by chat_id for the current user. Messages are numbered by their position in the chat. "
+        "Use `limit` (and `before`, set to the previous `first_seq`) to page backwards from the latest messages, "
+        "or `since` to fetch only messages added after the ones a client already has."
+    ),
 )
-def get_chat(chat_id: str, user: dict = Depends(get_current_user)):
-    return get_chat_conversation(user["user_id"], chat_id)
+async def get_chat(
+    chat_id: str,
+    before: int | None = Query(None, ge=0, description="Return messages preceding this sequence number"),
+    limit: int | None = Query(None, ge=1, le=500, description="Maximum number of messages to return"),
+    since: int | None = Query(None, ge=0, description="Return messages from this sequence number on"),
+    user: dict = Depends(get_current_user),
+):
+    return await get_chat_conversation(user["user_id"], chat_id, before, limit, since)
 
 
 @router.get(
     "/",
     response_model=UserChatsCollection,
     status_code=status.HTTP_200_OK,
-    summary="Get all user chats",
-    description="Retrieve a list of all chat sessions for the current user",
+    summary="Get user chats",
+    description=(
+        "Retrieve the chat sessions of the current user, newest first, one page at a time. "
+        "Pass the returned `next_cursor` as `after` to get the next page."
+    ),
 )
-def list_chats(user: dict = Depends(get_current_user)):
-    return get_user_chats_collection(user["user_id"])
+async def list_chats(
+    limit: int = Query(50, ge=1, le=200, description="Number of chats per page"),
+    after: str | None = Query(None, description="Cursor returned as `next_cursor` by the previous page"),
+    user: dict = Depends(get_current_user),
+):
+    return await get_user_chats_collection(user["user_id"], limit, after)
 
 
 @router.patch(
@@ -161,12 +282,12 @@ def list_chats(user: dict = Depends(get_current_user)):
     summary="Rename chat title",
     description="Rename the title of a chat section by chat_id for the current user",
 )
-def rename_chat(
+async def rename_chat(
     chat_id: str,
     chat_title: str = Body(..., description="New chat title", example="My New Chat"),
     user: dict = Depends(get_current_user),
 ):
-    return rename_chat_conversation(user["user_id"], chat_id, chat_title)
+    return await rename_chat_conversation(user["user_id"], chat_id, chat_title)
 
 
 @router.delete(
@@ -175,5 +296,5 @@ def rename_chat(
     summary="Delete chat section",
     description="Delete a chat section by chat_id for the current user",
 )
-def delete_chat(chat_id: str, user: dict = Depends(get_current_user)):
-    return delete_chat_conversation(user["user_id"], chat_id)
+async def delete_chat(chat_id: str, user: dict = Depends(get_current_user)):
+    return await delete_chat_conversation(user["user_id"], chat_id)
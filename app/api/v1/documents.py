@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, status
+
+from app.services.document_service import delete_document, ingest_document, list_documents
+from app.models.document import DocumentCreateRequest, DocumentListResponse, DocumentResponse
+from app.middlewares.auth import get_current_user
+
+
+router = APIRouter(prefix="/api/v1/documents", tags=["Documents"])
+
+
+@router.post(
+    "/",
+    response_model=DocumentResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Upload a document",
+    description=(
+        "Split a plain text document into chunks and index their embeddings. "
+        "The most relevant chunks are then added to the user's chats as context."
+    ),
+)
+async def upload_document(document: DocumentCreateRequest, user: dict = Depends(get_current_user)):
+    return await ingest_document(user["user_id"], document.title, document.text)
+
+
+@router.get(
+    "/",
+    response_model=DocumentListResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get all documents",
+    description="Retrieve the documents uploaded by the current user",
+)
+async def get_documents(user: dict = Depends(get_current_user)):
+    return await list_documents(user["user_id"])
+
+
+@router.delete(
+    "/{document_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a document",
+    description="Delete a document so its chunks are no longer used as chat context",
+)
+async def remove_document(document_id: str, user: dict = Depends(get_current_user)):
+    await delete_document(user["user_id"], document_id)
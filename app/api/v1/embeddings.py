@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.services.embedding_service import embedding_batcher
+from app.models.embedding import EmbeddingRequest, EmbeddingResponse
+from app.config import settings
+from app.middlewares.auth import get_current_user
+from app.services.model_registry_service import model_registry
+
+MAX_INPUTS = 512
+
+
+router = APIRouter(prefix="/api/v1/embeddings", tags=["Embeddings"])
+
+
+@router.post(
+    "",
+    response_model=EmbeddingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Embed texts",
+    description=(
+        "Compute embedding vectors with an Ollama model. Concurrent requests are merged into batched "
+        "Ollama calls and vectors of texts seen before are served from a cache."
+    ),
+)
+async def create_embeddings(embedding_request: EmbeddingRequest, user: dict = Depends(get_current_user)):
+    model = embedding_request.model if embedding_request.model else settings.EMBEDDING_MODEL
+    texts = [embedding_request.input] if isinstance(embedding_request.input, str) else embedding_request.input
+    if not texts or len(texts) > MAX_INPUTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Between 1 and {MAX_INPUTS} inputs are required",
+        )
+    await model_registry.validate(model)
+
+    embeddings = await embedding_batcher.embed(texts, model)
+    return EmbeddingResponse(model=model, embeddings=embeddings)
@@ -10,9 +10,65 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = 5.0
+    JWT_CACHE_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
     DEFAULT_MODEL: str = "llama3"
     MONGO_URI: str = Field(..., env="MONGO_URI")
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 20000
+    MONGO_COMPRESSORS: str = ""  # e.g. "zstd,snappy,zlib"
     ORIGINS: str = os.getenv("ORIGINS", "*")
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_BODY_MAX_BYTES: int = 1024
+    OLLAMA_NUM_PARALLEL: int = 1
+    MODEL_CONCURRENCY: str = ""  # Per-model overrides, e.g. "llama3=4,mistral=2"
+    SCHEDULER_MAX_QUEUE: int = 100
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 1000
+    JOB_MAX_RETRIES: int = 3
+    JOB_RETRY_DELAY_SECONDS: float = 0.5
+    CONVERSATION_CACHE_SIZE: int = 1000
+    OLLAMA_KEEP_ALIVE: str = "5m"
+    MODEL_LIST_TTL_SECONDS: float = 60.0
+    WARMUP_ENABLED: bool = True
+    WARMUP_MODELS: str = ""  # Comma separated, defaults to DEFAULT_MODEL
+    HOT_MODEL_KEEP_ALIVE: str = "-1m"  # Negative keeps the model loaded until it goes cold
+    HOT_MODEL_IDLE_SECONDS: float = 1800.0
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    MODEL_CONTEXT_BUDGETS: str = ""  # Per-model overrides, e.g. "llama3=8000,mistral=28000"
+    CONTEXT_TRIM_RATIO: float = 0.5  # Share of the budget kept as recent turns after a trim
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_SIZE: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    RESPONSE_CACHE_MONGO: bool = False  # Share cached responses between workers through MongoDB
+    STREAM_SINGLE_FLIGHT: bool = True  # Identical concurrent streams share one generation
+    STREAM_FLUSH_BYTES: int = 256  # A streamed frame is sent once it holds this many bytes,
+    STREAM_FLUSH_TOKENS: int = 16  # or this many tokens,
+    STREAM_FLUSH_INTERVAL_MS: float = 50.0  # or its oldest token has waited this long
+    STREAM_INTERRUPT_POLICY: str = "save"  # "save" keeps partial answers of interrupted streams, "discard" drops the turn
+    EMBEDDING_MODEL: str = "nomic-embed-text"
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_DELAY_MS: float = 5.0  # Longest a text waits for others to share its Ollama call
+    EMBEDDING_CACHE_SIZE: int = 10000
+    SEARCH_SEMANTIC_ENABLED: bool = False  # Needs numpy and the embedding model
+    SEARCH_INDEX_CACHE_SIZE: int = 100  # Users whose vector index is kept in memory
+    RAG_ENABLED: bool = False  # Needs numpy and the embedding model
+    RAG_DATA_DIR: str = "data/rag"
+    RAG_CHUNK_CHARS: int = 1000
+    RAG_CHUNK_OVERLAP: int = 150
+    RAG_TOP_K: int = 4
+    RAG_MIN_SCORE: float = 0.3  # Chunks less similar to the question are not injected
+    RAG_INDEX_MIN_ROWS: int = 10000  # Smaller stores are searched exhaustively
+    RAG_INDEX_PROBES: int = 8
     
     class Config:
         env_file = ".env"
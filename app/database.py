@@ -1,9 +1,186 @@
-from pymongo import MongoClient
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, AsyncMongoClient, IndexModel, monitoring
+from pymongo.errors import PyMongoError
 from app.config import settings
+from app.services.metrics_service import Counter, Histogram
+
+mongo_operation_duration = Histogram(
+    "mongo_operation_duration_seconds", "Duration of MongoDB commands", ["command", "collection"]
+)
+mongo_operation_errors = Counter(
+    "mongo_operation_errors_total", "Failed MongoDB commands", ["command", "collection"]
+)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records the latency of every command the services send to MongoDB."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
 
-client = MongoClient(settings.MONGO_URI)
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_operation_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_operation_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+        mongo_operation_errors.inc(event.command_name, collection)
+
+
+client_options = {
+    "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+    "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+    "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+    "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+    "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+    "event_listeners": [CommandMetricsListener()],
+}
+if settings.MONGO_COMPRESSORS:
+    client_options["compressors"] = settings.MONGO_COMPRESSORS
+
+client = AsyncMongoClient(settings.MONGO_URI, **client_options)
 db = client["chatbot"]
 
 users_collection = db["users"]
 chats_collection = db["chats"]
-token_blacklist = db["token_blacklist"]
\ No newline at end of file
+token_blacklist = db["token_blacklist"]
+response_cache_collection = db["response_cache"]
+chat_embeddings_collection = db["chat_embeddings"]
+documents_collection = db["documents"]
+document_chunks_collection = db["document_chunks"]
+
+
+# Indexes every collection needs, created and verified at startup
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "chats": [
+        IndexModel([("user_id", ASCENDING), ("chat_id", ASCENDING)], name="user_chat_unique", unique=True),
+        # Keyword search within one user's chats; the user_id prefix keeps each search to that user's entries
+        IndexModel(
+            [("user_id", ASCENDING), ("title", TEXT), ("messages.content", TEXT)],
+            name="user_chat_text",
+            weights={"title": 5, "messages.content": 1},
+            default_language="none",
+        ),
+        # Covers the paginated chat list: filter, keyset sort and projected fields
+        IndexModel(
+            [
+                ("user_id", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+                ("chat_id", ASCENDING),
+                ("title", ASCENDING),
+                ("model", ASCENDING),
+            ],
+            name="user_chat_list",
+        ),
+    ],
+    "token_blacklist": [
+        IndexModel([("jti", ASCENDING)], name="jti_unique", unique=True, sparse=True),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+        # Entries are useless once the token itself has expired
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "chat_embeddings": [
+        IndexModel([("user_id", ASCENDING), ("chat_id", ASCENDING)], name="user_chat"),
+    ],
+    "documents": [
+        IndexModel([("user_id", ASCENDING), ("document_id", ASCENDING)], name="user_document_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created_at"),
+    ],
+    "document_chunks": [
+        # Rows of the user's vector store map back to their chunk text
+        IndexModel([("user_id", ASCENDING), ("row", ASCENDING)], name="user_row_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("document_id", ASCENDING)], name="user_document"),
+    ],
+    "response_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Indexes superseded by the ones above, dropped at startup
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    "chats": ["user_created_at"],
+    "token_blacklist": ["token"],
+}
+
+# Indexes the services rely on for correctness, not just speed: startup
+# fails without them. Idempotent chat appends depend on user_chat_unique.
+REQUIRED_INDEXES: Dict[str, List[str]] = {
+    "chats": ["user_chat_unique"],
+}
+
+# Hot queries that must be served by an index: (collection, filter, sort).
+# tests/test_query_plans.py explains them against a live server.
+QUERY_PLAN_CHECKS = [
+    ("users", {"username": "johndoe"}, None),
+    ("users", {"email": "john.doe@example.com"}, None),
+    ("chats", {"user_id": "12345"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("chats", {"user_id": "12345", "chat_id": "67890"}, None),
+    ("token_blacklist", {"revoked_at": {"$gte": datetime(2025, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("chat_embeddings", {"user_id": "12345", "model": "nomic-embed-text"}, None),
+    ("documents", {"user_id": "12345"}, [("created_at", DESCENDING)]),
+    ("document_chunks", {"user_id": "12345", "row": {"$in": [0, 1]}}, None),
+]
+
+
+async def ensure_indexes():
+    """Create the declared indexes and check that they all exist.
+
+    Raises RuntimeError when one of the REQUIRED_INDEXES cannot be created;
+    other failures are only logged.
+    """
+    for collection_name, indexes in INDEXES.items():
+        collection = db[collection_name]
+        required = REQUIRED_INDEXES.get(collection_name, [])
+        try:
+            await collection.create_indexes(indexes)
+            existing = await collection.index_information()
+        except PyMongoError as e:
+            if required:
+                raise RuntimeError(f"Failed to create required indexes on {collection_name}: {str(e)}") from e
+            logging.error(f"Failed to create indexes on {collection_name}: {str(e)}")
+            continue
+
+        missing = [index.document["name"] for index in indexes if index.document["name"] not in existing]
+        if any(name in required for name in missing):
+            raise RuntimeError(f"Missing required indexes on {collection_name}: {', '.join(missing)}")
+        if missing:
+            logging.error(f"Missing indexes on {collection_name}: {', '.join(missing)}")
+
+        for name in OBSOLETE_INDEXES.get(collection_name, []):
+            if name in existing:
+                try:
+                    await collection.drop_index(name)
+                except PyMongoError as e:
+                    logging.warning(f"Failed to drop index {name} on {collection_name}: {str(e)}")
+
+
+async def verify_query_plans() -> List[str]:
+    """Explain the hot queries and return those that fall back to a collection scan."""
+    collection_scans = []
+    for collection_name, query, sort in QUERY_PLAN_CHECKS:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        if "COLLSCAN" in str(plan.get("queryPlanner", {}).get("winningPlan", {})):
+            collection_scans.append(f"{collection_name}: {query}")
+    return collection_scans
+
+
+async def close_database():
+    await client.close()
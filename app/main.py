@@ -1,19 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
 
-from app.middlewares.logger import LoggingMiddleware
+from app.middlewares.logger import LoggingMiddleware, log_listener
+from app.middlewares.metrics import MetricsMiddleware
 from app.api.v1.auth import router as auth_router
 from app.api.v1.chat import router as chat_router
+from app.api.v1.documents import router as documents_router
+from app.api.v1.embeddings import router as embeddings_router
 from app.config import settings
+from app.database import close_database, ensure_indexes
+from app.services.job_service import background_jobs
+from app.services.revocation_service import revocation_cache
+from app.services.password_service import password_hasher
+from app.services.metrics_service import render_metrics
+from app.services.model_registry_service import model_registry
+from app.services.warmup_service import model_warmup
+from app.utils.vector_index import np
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener.start()
+    if np is None and (settings.SEARCH_SEMANTIC_ENABLED or settings.RAG_ENABLED):
+        raise RuntimeError("SEARCH_SEMANTIC_ENABLED and RAG_ENABLED require numpy, which is not installed")
+    await ensure_indexes()
+    await revocation_cache.start()
+    await background_jobs.start()
+    password_hasher.start()
+    await model_registry.start()
+    await model_warmup.start()
+    yield
+    await model_warmup.stop()
+    await model_registry.stop()
+    password_hasher.stop()
+    await background_jobs.stop()
+    await revocation_cache.stop()
+    await close_database()
+    log_listener.stop()
+
 
 app = FastAPI(
     title="Simple Chatbot API",
     description="A simple chatbot API using FastAPI and Ollama",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -41,5 +78,13 @@ def test_websocket():
     return HTMLResponse(content=html_content)
 
 
+@app.get("/metrics", tags=["Metrics"], include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    """Expose metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(chat_router)
+app.include_router(documents_router)
+app.include_router(embeddings_router)
 app.include_router(auth_router)
@@ -1,8 +1,13 @@
+import hashlib
+import time
 from typing import Optional
 from fastapi import Depends, HTTPException, Request, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from app.config import settings
+from app.services.revocation_service import revocation_cache, token_id
+from app.utils import LRUCache
+from app.services.metrics_service import Counter, Gauge
 
 
 class OptionalHTTPBearer(HTTPBearer):
@@ -19,21 +24,48 @@ class OptionalHTTPBearer(HTTPBearer):
 security = HTTPBearer()
 optional_security = OptionalHTTPBearer()
 
+# Verified payloads by token digest, each kept until the token's own expiry
+decoded_tokens = LRUCache(settings.JWT_CACHE_SIZE)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    try:
+
+def decode_token(token: str) -> dict:
+    """Verify and decode a JWT, reusing the result for tokens seen before."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = decoded_tokens.get(key)
+    if payload is None:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload  # payload chứa user_id
+        exp = payload.get("exp")
+        decoded_tokens.set(key, payload, ttl=exp - time.time() if exp else None)
+    return payload
+
+
+Counter(
+    "jwt_cache_lookups_total", "Decoded token cache lookups", ["result"],
+    collect=lambda: {("hit",): decoded_tokens.hits, ("miss",): decoded_tokens.misses},
+)
+Gauge(
+    "jwt_cache_entries", "Decoded tokens currently cached",
+    collect=lambda: {(): len(decoded_tokens)},
+)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    try:
+        payload = decode_token(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    if revocation_cache.is_revoked(token_id(payload, token)):
+        raise HTTPException(status_code=401, detail="Token has been invalidated")
+    return payload  # payload chứa user_id
+
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
 ):
     """Get current user information if token is valid, otherwise return None."""
@@ -42,16 +74,16 @@ def get_current_user_optional(
 
     try:
         token = credentials.credentials
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        return payload
+        payload = decode_token(token)
     except (jwt.PyJWTError, AttributeError):
         return None
 
+    if revocation_cache.is_revoked(token_id(payload, token)):
+        return None
+    return payload
+
 
 async def get_current_user_ws(websocket: WebSocket):
-    print("\t ⭐ WebSocket query params:", websocket.query_params)
     auth_token = websocket.query_params.get("token")
     # Or from headers (e.g., for custom protocols)
     if not auth_token:
@@ -63,11 +95,10 @@ async def get_current_user_ws(websocket: WebSocket):
         return None
 
     try:
-        payload = jwt.decode(
-            auth_token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        return payload
+        payload = decode_token(auth_token)
     except (jwt.PyJWTError, AttributeError):
-        return None
\ No newline at end of file
+        return None
+
+    if revocation_cache.is_revoked(token_id(payload, auth_token)):
+        return None
+    return payload
\ No newline at end of file
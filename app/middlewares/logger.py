@@ -1,66 +1,110 @@
 import time
 import json
 import logging
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-# from starlette.types import Message
+import queue
+import random
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='\t%(asctime)s - %(name)s - %(levelname)s - %(message)s',
 )
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# Request logs are queued on the request path and written by a listener thread
+log_queue = queue.SimpleQueue()
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(JsonFormatter())
+log_listener = QueueListener(log_queue, _console_handler)
+
 logger = logging.getLogger("api")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+
+_BODY_METHODS = {"POST", "PUT", "PATCH"}
+# Bodies carrying passwords or tokens are never logged
+_PRIVATE_PATHS = ("/api/v1/auth",)
+
+
+class LoggingMiddleware:
+    """Pure ASGI request logger: one structured JSON line per sampled HTTP request.
+
+    WebSocket and lifespan traffic pass straight through. Request bodies are
+    only captured for JSON requests with a known length, up to LOG_BODY_MAX_BYTES.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or random.random() >= settings.LOG_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        body = bytearray()
+        body_limit = settings.LOG_BODY_MAX_BYTES
+
+        if (
+            scope["method"] in _BODY_METHODS
+            and body_limit > 0
+            and not scope["path"].startswith(_PRIVATE_PATHS)
+            and self._is_json_with_length(scope)
+        ):
+            async def receive_and_capture() -> Message:
+                message = await receive()
+                if message["type"] == "http.request" and len(body) < body_limit:
+                    body.extend(message.get("body", b"")[:body_limit - len(body)])
+                return message
+        else:
+            receive_and_capture = receive
+
+        async def send_and_record(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_and_capture, send_and_record)
+        finally:
+            fields = {
+                "request_id": uuid.uuid4().hex,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - start_time) * 1000, 3),
+                "client": scope["client"][0] if scope.get("client") else None,
+            }
+            if body:
+                fields["body"] = body.decode("utf-8", errors="replace")
+            logger.info("request", extra={"fields": fields})
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Log request
-        request_id = str(time.time())
-        await self._log_request(request, request_id)
-
-        # Process the request and get response
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-
-        # Log response
-        await self._log_response(response, request_id, process_time)
-        
-        return response
-
-    async def _log_request(self, request: Request, request_id: str):
-        headers = dict(request.headers)
-        # Mask Authorization token for security
-        if "authorization" in headers:
-            headers["authorization"] = f"{headers['authorization'][0:15]}...MASKED..."
-        
-        body = None
-        if request.method in ["POST", "PUT", "PATCH"]:
-            # Make a copy of the request body
-            receive_ = await request._receive()
-            
-            async def receive():
-                return receive_
-            
-            request._receive = receive
-            
-            try:
-                # Try to parse JSON body, catch exceptions for non-JSON content
-                body_bytes = receive_.get("body", b"")
-                if body_bytes:
-                    body = json.loads(body_bytes)
-            except json.JSONDecodeError:
-                body = "Unable to parse request body"
-                
-        logger.info(f"🌐 REQUEST [{request_id}] - {request.method} {request.url.path}")
-        logger.info(f"📃 HEADERS [{request_id}] - {headers}")
-        if body:
-            logger.info(f"🅱️ BODY [{request_id}] - {body}")
-            
-    async def _log_response(self, response: Response, request_id: str, process_time: float):
-        # Log response status and processing time
-        logger.info(f"📨 RESPONSE [{request_id}] - Status: {response.status_code}, Time: {process_time:.4f}s")
-        
-        # Log response headers
-        headers = dict(response.headers)
-        logger.info(f"📨 RESPONSE HEADERS [{request_id}] - {headers}")
\ No newline at end of file
+    @staticmethod
+    def _is_json_with_length(scope: Scope) -> bool:
+        has_length = is_json = False
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                has_length = True
+            elif name == b"content-type":
+                is_json = value.startswith(b"application/json")
+        return has_length and is_json
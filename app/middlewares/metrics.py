@@ -0,0 +1,39 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics_service import Counter, Histogram
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+http_requests = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route template."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_and_record(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            # The router stores the matched route in the scope, which keeps label cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - start_time, scope["method"], route_path)
+            http_requests.inc(scope["method"], route_path, str(status_code))
@@ -1,5 +1,5 @@
-from typing import List
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field, model_validator
 
 from app.config import settings
 
@@ -19,11 +19,27 @@ class ChatCompletionRequest(BaseModel):
         description="Model name",
         example=settings.DEFAULT_MODEL,
     )
-    messages: List[ChatMessage] = Field(
-        ...,
+    messages: List[ChatMessage] | None = Field(
+        None,
         description="List of messages",
         example=[ChatMessage(role="user", content="Hello!")],
     )
+    message: ChatMessage | None = Field(
+        None,
+        description="Only the new user message, the history of `chat_id` is loaded server-side",
+        example=ChatMessage(role="user", content="Hello!"),
+    )
+    options: Dict[str, Any] | None = Field(
+        None,
+        description="Ollama generation options; responses with temperature 0 may be served from the cache",
+        example={"temperature": 0},
+    )
+
+    @model_validator(mode="after")
+    def check_messages(self):
+        if not self.messages and self.message is None:
+            raise ValueError("Either 'messages' or 'message' is required")
+        return self
 
     class Config:
         json_schema_extra = {
@@ -46,6 +62,7 @@ class ChatCompletionResponse(BaseModel):
         description="Response from the model",
         example="Hello! How can I assist you?",
     )
+    cached: bool = Field(False, description="Whether the response was served from the response cache", example=False)
 
     class Config:
         json_schema_extra = {
@@ -53,6 +70,7 @@ class ChatCompletionResponse(BaseModel):
                 "chat_id": "67890",
                 "title": "My Chat",
                 "response": "Hello! How can I assist you?",
+                "cached": False,
             }
         }
 
@@ -68,6 +86,12 @@ class ChatConversation(BaseModel):
         ..., description="Model used for the chat", example=settings.DEFAULT_MODEL
     )
     messages: List[ChatMessage] = Field(..., description="List of chat messages")
+    message_count: int | None = Field(
+        None, description="Total number of messages in the chat", example=2
+    )
+    first_seq: int | None = Field(
+        None, description="Sequence number (position in the chat) of the first returned message", example=0
+    )
 
     class Config:
         json_schema_extra = {
@@ -77,6 +101,8 @@ class ChatConversation(BaseModel):
                 "title": "My Chat",
                 "created_at": "2023-10-01T12:00:00Z",
                 "model": settings.DEFAULT_MODEL,
+                "message_count": 2,
+                "first_seq": 0,
                 "messages": [
                     {"role": "user", "content": "Hello!"},
                     {
@@ -88,9 +114,35 @@ class ChatConversation(BaseModel):
         }
 
 
+class ChatSummary(BaseModel):
+    chat_id: str = Field(..., description="Chat ID", example="67890")
+    title: str = Field(..., description="Title of the chat", example="My Chat")
+    created_at: str = Field(
+        ..., description="Creation timestamp", example="2023-10-01T12:00:00Z"
+    )
+    model: str | None = Field(
+        None, description="Model used for the chat", example=settings.DEFAULT_MODEL
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "chat_id": "67890",
+                "title": "My Chat",
+                "created_at": "2023-10-01T12:00:00Z",
+                "model": settings.DEFAULT_MODEL,
+            }
+        }
+
+
 class UserChatsCollection(BaseModel):
     user_id: str = Field(..., description="User ID", example="12345")
-    chats: List[ChatConversation] = Field(..., description="List of chat sections")
+    chats: List[ChatSummary] = Field(..., description="One page of chat sections, newest first")
+    next_cursor: str | None = Field(
+        None,
+        description="Pass as `after` to fetch the next page; null on the last page",
+        example="eyJjIjogIjIwMjMtMTAtMDFUMTI6MDA6MDBaIn0",
+    )
 
     class Config:
         json_schema_extra = {
@@ -102,15 +154,9 @@ class UserChatsCollection(BaseModel):
                         "title": "My Chat",
                         "created_at": "2023-10-01T12:00:00Z",
                         "model": settings.DEFAULT_MODEL,
-                        "messages": [
-                            {"role": "user", "content": "Hello!"},
-                            {
-                                "role": "assistant",
-                                "content": "Hi there! How can I help you today?",
-                            },
-                        ],
                     }
                 ],
+                "next_cursor": None,
             }
         }
 
@@ -156,4 +202,59 @@ class ChatRenameResponse(BaseModel):
                 "title": "My New Chat",
                 "success": True,
             }
-        }
\ No newline at end of file
+        }
+
+class ModelQueueStats(BaseModel):
+    model: str = Field(..., description="Model name", example=settings.DEFAULT_MODEL)
+    concurrency: int = Field(..., description="Maximum concurrent generations", example=1)
+    active: int = Field(..., description="Generations currently running", example=1)
+    queued: int = Field(..., description="Requests waiting for a slot", example=0)
+    served: int = Field(..., description="Requests that obtained a slot", example=42)
+    rejected: int = Field(..., description="Requests rejected because the queue was full", example=0)
+    avg_wait_seconds: float = Field(..., description="Average time spent waiting for a slot", example=0.25)
+    max_wait_seconds: float = Field(..., description="Longest time spent waiting for a slot", example=1.5)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model": settings.DEFAULT_MODEL,
+                "concurrency": 1,
+                "active": 1,
+                "queued": 0,
+                "served": 42,
+                "rejected": 0,
+                "avg_wait_seconds": 0.25,
+                "max_wait_seconds": 1.5,
+            }
+        }
+
+
+class SchedulerStatsResponse(BaseModel):
+    models: List[ModelQueueStats] = Field(..., description="Queue statistics per model")
+
+
+class ChatSearchHit(BaseModel):
+    chat_id: str = Field(..., description="Chat ID", example="67890")
+    title: str = Field(..., description="Title of the chat", example="My Chat")
+    created_at: str = Field(
+        ..., description="Creation timestamp", example="2023-10-01T12:00:00Z"
+    )
+    snippet: str = Field(..., description="Excerpt of the best matching message", example="…how do I reset my password…")
+    score: float = Field(..., description="Relevance score, higher is better", example=1.5)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "chat_id": "67890",
+                "title": "My Chat",
+                "created_at": "2023-10-01T12:00:00Z",
+                "snippet": "…how do I reset my password…",
+                "score": 1.5,
+            }
+        }
+
+
+class ChatSearchResponse(BaseModel):
+    query: str = Field(..., description="Search query", example="reset password")
+    mode: str = Field(..., description="Search mode, `text` or `semantic`", example="text")
+    results: List[ChatSearchHit] = Field(..., description="Matching chats, best first")
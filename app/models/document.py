@@ -0,0 +1,37 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class DocumentCreateRequest(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200, description="Document title", example="Employee handbook")
+    text: str = Field(..., min_length=1, description="Plain text content of the document", example="Welcome to the team! ...")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "title": "Employee handbook",
+                "text": "Welcome to the team! ...",
+            }
+        }
+
+
+class DocumentResponse(BaseModel):
+    document_id: str = Field(..., description="Document ID", example="a1b2c3d4")
+    title: str = Field(..., description="Document title", example="Employee handbook")
+    chunks: int = Field(..., description="Number of indexed chunks", example=42)
+    created_at: str = Field(..., description="Upload timestamp", example="2023-10-01T12:00:00Z")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "document_id": "a1b2c3d4",
+                "title": "Employee handbook",
+                "chunks": 42,
+                "created_at": "2023-10-01T12:00:00Z",
+            }
+        }
+
+
+class DocumentListResponse(BaseModel):
+    documents: List[DocumentResponse] = Field(..., description="Documents of the current user, newest first")
+    total: int = Field(..., description="Total number of documents", example=1)
@@ -0,0 +1,38 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.config import settings
+
+
+class EmbeddingRequest(BaseModel):
+    model: str | None = Field(
+        default=settings.EMBEDDING_MODEL,
+        description="Embedding model name",
+        example=settings.EMBEDDING_MODEL,
+    )
+    input: str | List[str] = Field(
+        ...,
+        description="Text or list of texts to embed",
+        example=["Hello!", "How are you?"],
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model": settings.EMBEDDING_MODEL,
+                "input": ["Hello!", "How are you?"],
+            }
+        }
+
+
+class EmbeddingResponse(BaseModel):
+    model: str = Field(..., description="Embedding model name", example=settings.EMBEDDING_MODEL)
+    embeddings: List[List[float]] = Field(..., description="One vector per input text, in input order")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model": settings.EMBEDDING_MODEL,
+                "embeddings": [[0.12, -0.03, 0.57], [0.08, 0.11, -0.42]],
+            }
+        }
@@ -1,59 +1,60 @@
+import uuid
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 import jwt
 from app.database import users_collection
 from fastapi import HTTPException, status
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from app.config import settings
 from app.models.user import AuthTokenResponse, RegistrationSuccessResponse, UserProfile, TokenRefreshResponse
-from app.database import token_blacklist
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+from app.services.revocation_service import revocation_cache, token_id
+from app.services.password_service import password_hasher
 
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
 def create_refresh_token(data: dict, expires_delta: timedelta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def register_user(
+async def register_user(
     username: str, email: str, password: str, confirm_password: str
 ) -> RegistrationSuccessResponse:
     if password != confirm_password:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match"
         )
-    if users_collection.find_one({"username": username}):
+    if await users_collection.find_one({"username": username}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Username already exists {username}"
         )
-    if users_collection.find_one({"email": email}):
+    if await users_collection.find_one({"email": email}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Email already used {email}"
         )
 
-    hashed_password = hash_password(password)
-    user_id = users_collection.insert_one(
-        {"username": username, "password": hashed_password, "email": email}
-    ).inserted_id
+    hashed_password = await password_hasher.hash(password)
+    try:
+        result = await users_collection.insert_one(
+            {"username": username, "password": hashed_password, "email": email}
+        )
+    except DuplicateKeyError as e:
+        # A concurrent registration took the name or address after the checks above
+        if "email" in (e.details or {}).get("keyPattern", {}):
+            detail = f"Email already used {email}"
+        else:
+            detail = f"Username already exists {username}"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    user_id = result.inserted_id
 
     token = create_access_token({"user_id": str(user_id)})
     refresh_token = create_refresh_token({"user_id": str(user_id)})
@@ -62,38 +63,42 @@ def register_user(
     )
 
 
-def login_user(username: str, password: str) -> AuthTokenResponse:
-    user = users_collection.find_one({"username": username})
+async def login_user(username: str, password: str) -> AuthTokenResponse:
+    user = await users_collection.find_one({"username": username})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not exists"
         )
-    if not verify_password(password, user["password"]):
+    is_valid, new_hash = await password_hasher.verify(password, user["password"])
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
+    if new_hash:
+        # Stored hash uses an outdated cost factor, upgrade it transparently
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
 
     access_token = create_access_token({"user_id": str(user["_id"])})
     refresh_token = create_refresh_token({"user_id": str(user["_id"])})
     return AuthTokenResponse(user_id=str(user["_id"]), access_token=access_token, refresh_token=refresh_token)
 
 
-def get_user(token: str) -> UserProfile:
+async def get_user(token: str) -> UserProfile:
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
-    if token_blacklist.find_one({"token": token}):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been invalidated",
-        )
-
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
+        if revocation_cache.is_revoked(token_id(payload, token)):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been invalidated",
+            )
+
         user_id = payload.get("user_id")
 
         if user_id is None:
@@ -101,7 +106,7 @@ def get_user(token: str) -> UserProfile:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
             )
 
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        user = await users_collection.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -125,6 +130,8 @@ def get_user(token: str) -> UserProfile:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -132,25 +139,28 @@ def get_user(token: str) -> UserProfile:
         )
 
 
-def logout_user(access_token: str, refresh_token: str):
+async def logout_user(access_token: str, refresh_token: str):
     try:
         payload = jwt.decode(
             access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         exp_timestamp = payload.get("exp")
+        # The refresh token outlives the access token, so the TTL index
+        # must keep its blacklist entry until its own expiry
+        refresh_payload = jwt.decode(
+            refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM],
+            options={"verify_exp": False},
+        )
+        refresh_exp_timestamp = refresh_payload.get("exp", exp_timestamp)
 
-        # Add token to blacklist
-        # TODO: implement by redis
-        token_blacklist.insert_many([
-            {
-                "token": access_token,
-                "expires_at": datetime.fromtimestamp(exp_timestamp, tz=timezone.utc),
-            },
-            {
-                "token": refresh_token,
-                "expires_at": datetime.fromtimestamp(exp_timestamp, tz=timezone.utc),
-            }
-        ])
+        await revocation_cache.revoke(
+            token_id(payload, access_token),
+            datetime.fromtimestamp(exp_timestamp, tz=timezone.utc),
+        )
+        await revocation_cache.revoke(
+            token_id(refresh_payload, refresh_token),
+            datetime.fromtimestamp(refresh_exp_timestamp, tz=timezone.utc),
+        )
 
         return {"message": "User logged out successfully"}
     except jwt.InvalidTokenError:
@@ -159,15 +169,15 @@ def logout_user(access_token: str, refresh_token: str):
         )
 
 
-def refresh_user_access_token(refresh_token: str) -> TokenRefreshResponse:
+async def refresh_user_access_token(refresh_token: str) -> TokenRefreshResponse:
     try:
-        if token_blacklist.find_one({"token": refresh_token}):
+        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        if revocation_cache.is_revoked(token_id(payload, refresh_token)):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Refresh token has been invalidated",
             )
-        
-        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
         user_id = payload.get("user_id")
         
         if not user_id:
@@ -176,7 +186,7 @@ def refresh_user_access_token(refresh_token: str) -> TokenRefreshResponse:
                 detail="Invalid refresh token payload"
             )
             
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        user = await users_collection.find_one({"_id": ObjectId(user_id)})
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, 
@@ -188,5 +198,5 @@ def refresh_user_access_token(refresh_token: str) -> TokenRefreshResponse:
         return TokenRefreshResponse(access_token=new_access_token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Refresh token expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
\ No newline at end of file
@@ -1,147 +1,381 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import base64
+import binascii
 import logging
+from contextlib import aclosing
 
-from typing import AsyncGenerator, List
+from typing import Any, AsyncGenerator, Dict, List
+from bson import json_util
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
 from fastapi import HTTPException, WebSocket, status
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
+from starlette.websockets import WebSocketState
 
 from app.database import chats_collection
 from app.models.chat import (
     ChatMessage, ChatCompletionResponse, ChatConversation,
-    ChatRenameResponse, UserChatsCollection, AIModel, AvailableModelsResponse
+    ChatRenameResponse, ChatSummary, UserChatsCollection, AIModel, AvailableModelsResponse,
+    SchedulerStatsResponse
+)
+from app.utils import (
+    generate_id, get_current_time, format_size, LRUCache, SingleFlight, coalesce, replay_text,
+    FrameWriter, FRAME_JSON,
 )
-from app.utils import generate_id, get_current_time, format_size
 from app.config import settings
-from app.services.ollama_service import send_chat_to_ollama, generate_chat_title, get_all_ollama_models, stream_chat_to_ollama
-
-
-executor = ThreadPoolExecutor(max_workers=1)
+from app.services.ollama_service import send_chat_to_ollama, generate_chat_title, stream_chat_to_ollama
+from app.services.model_registry_service import model_registry
+from app.services.warmup_service import model_warmup
+from app.services.scheduler_service import scheduler
+from app.services.job_service import background_jobs
+from app.services.context_service import build_context_window, summary_cache
+from app.services.response_cache_service import response_cache, response_cache_key
+from app.services.search_service import delete_chat_index, index_chat_messages
+from app.services.document_service import augment_with_documents
+from app.services.metrics_service import Gauge
+
+
+# Recent conversations by (user_id, chat_id), so clients can send only the new message
+conversation_cache = LRUCache(settings.CONVERSATION_CACHE_SIZE)
+
+# Generations in flight by response cache key, shared by identical requests
+stream_flights = SingleFlight()
+
+Gauge(
+    "stream_single_flight_active", "Streamed generations currently shared through single-flight",
+    collect=lambda: {(): len(stream_flights)},
+)
 
 
 async def create_chat_completion_stream(
     websocket: WebSocket,
     user_id: str,
     chat_id: str,
-    messages: List[ChatMessage],
+    messages: List[ChatMessage] | None,
     model: str = settings.DEFAULT_MODEL,
     interrupt_event: asyncio.Event = None,
+    message: ChatMessage | dict | None = None,
+    options: Dict[str, Any] | None = None,
+    frame_mode: str = FRAME_JSON,
 ) -> AsyncGenerator[str, None]:
-    messages_dict = [msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages]
-    
-    if messages_dict[-1]["role"] != "user":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Last message must be from the user",
-        )
-    
-    await websocket.send_json({"status": "start"})
+    writer = FrameWriter(websocket, frame_mode)
+    try:
+        messages_dict = await resolve_chat_messages(user_id, chat_id, messages, message)
+    except HTTPException as e:
+        await writer.send({"status": "error", "message": e.detail})
+        return
 
-    loop = asyncio.get_running_loop()
+    await writer.send({"status": "start"})
 
-    async def async_generator_from_thread(loop, thread_pool, func):
-        """Convert a regular generator function to be used asynchronously."""
-        gen = await loop.run_in_executor(thread_pool, func)
-        for item in gen:
-            yield item
+    is_new_chat = bool(user_id and not chat_id)
+    if is_new_chat:
+        chat_id = generate_id()
 
-    full_response = ""
+    parts: List[str] = []
+    interrupted = False
     try:
-        response_stream = async_generator_from_thread(loop, executor, lambda: stream_chat_to_ollama(messages_dict, model))
-        async for chunk in response_stream:
-            try:
-                if isinstance(chunk, str) and chunk.startswith("ERROR:"):
-                    await websocket.send_json({
-                        "status": "error",
-                        "message": chunk[6:]  # Remove "ERROR: " prefix
-                    })
-                    break
-                    
-                await websocket.send_json({
-                    "status": "streaming",
-                    "chunk": chunk
-                })  
-
-                full_response += chunk
-                
-                # Small pause to allow for cancellation
-                await asyncio.sleep(0.01)
-            except asyncio.CancelledError:
-                raise
-
-        await websocket.send_json({
-            "status": "complete",
-            "message": full_response
+        context = await build_context_window(user_id, None if is_new_chat else chat_id, messages_dict, model)
+        context = await augment_with_documents(user_id, context)
+
+        cache_key = response_cache_key(model, context, options)
+        cached_response = await response_cache.get(cache_key) if response_cache.is_cacheable(options) else None
+        if cached_response is not None:
+            chunks = replay_text(cached_response, settings.STREAM_FLUSH_BYTES)
+        else:
+            # Anonymous sockets each get their own lane in the fair queue
+            lane = user_id or f"ws:{id(websocket)}"
+            if settings.STREAM_SINGLE_FLIGHT:
+                chunks = stream_flights.subscribe(
+                    cache_key, lambda: _generate_stream(context, model, options, lane, cache_key)
+                )
+            else:
+                chunks = _generate_stream(context, model, options, lane, cache_key)
+
+        async with aclosing(chunks):
+            # Every send is a cancellation point, so an interrupt lands between frames
+            async for chunk in chunks:
+                await writer.chunk(chunk)
+                parts.append(chunk)
+
+        complete = {"status": "complete", "chat_id": chat_id, "cached": cached_response is not None}
+        if not writer.compact:
+            complete["message"] = "".join(parts)
+        await writer.send(complete)
+    except HTTPException as e:
+        await writer.send({
+            "status": "error",
+            "message": e.detail
         })
-    except InterruptedError:
+    except asyncio.CancelledError:
+        # Interrupt command or disconnect; the caller reports it to the client
         logging.info("Chat completion stream was interrupted")
-        await websocket.send_json({
-            "status": "interrupted",
-            "message": "Generation was cancelled"
-        })
+        interrupted = True
+        raise
     except Exception as e:
         logging.error(f"Error in stream_chat_to_ollama: {str(e)}")
-        await websocket.send_json({
+        await writer.send({
             "status": "error",
             "message": f"Error generating response: {str(e)}"
         })
     finally:
-        if user_id and not (interrupt_event and interrupt_event.is_set()):
-            logging.info("Saving chat conversation for user")
-            
-            messages_dict.append({"role": "assistant", "content": full_response})
-            chat_id = generate_id() if not chat_id and user_id else chat_id
-            chat_title = generate_chat_title(messages_dict)
-            save_chat_conversation(messages_dict, user_id, chat_id, model, chat_title)
+        interrupted = interrupted or bool(interrupt_event and interrupt_event.is_set())
+        keep_partial = parts and settings.STREAM_INTERRUPT_POLICY != "discard"
+        if user_id and (not interrupted or keep_partial):
+            logging.info("Queueing chat conversation save for user")
 
+            messages_dict.append({"role": "assistant", "content": "".join(parts)})
+            await queue_chat_save(messages_dict, user_id, chat_id, model, is_new_chat, writer=writer)
 
-def create_chat_completion(user_id: str, chat_id: str, messages: List[ChatMessage], model: str = settings.DEFAULT_MODEL) -> ChatCompletionResponse:
-    messages_dict = [msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages]
 
-    if messages_dict[-1]["role"] != "user":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Last message must be from the user",
+async def _generate_stream(
+    context: List[dict], model: str, options: Dict[str, Any] | None, lane: str, cache_key: str
+) -> AsyncGenerator[str, None]:
+    """Run one streamed generation in a scheduler slot and cache the answer once it completes."""
+    parts = []
+    async with scheduler.slot(model, lane):
+        model_warmup.touch(model)
+        frames = coalesce(
+            stream_chat_to_ollama(context, model, model_warmup.keep_alive_for(model), options),
+            settings.STREAM_FLUSH_BYTES,
+            settings.STREAM_FLUSH_TOKENS,
+            settings.STREAM_FLUSH_INTERVAL_MS / 1000,
         )
+        async with aclosing(frames):
+            async for frame in frames:
+                parts.append(frame)
+                yield frame
 
-    ai_response = send_chat_to_ollama(messages)
+    if response_cache.is_cacheable(options):
+        await response_cache.set(cache_key, model, "".join(parts))
 
-    messages_dict.append({"role": "assistant", "content": ai_response})
 
-    if user_id:
-        chat_id = generate_id() if not chat_id and user_id else chat_id
-        chat_title = generate_chat_title(messages_dict)
-        save_chat_conversation(messages_dict, user_id, chat_id, model, chat_title)
-        return ChatCompletionResponse(chat_id=str(chat_id), title=chat_title, response=ai_response)
+async def queue_chat_save(
+    messages_dict: List[dict],
+    user_id: str,
+    chat_id: str,
+    model: str,
+    is_new_chat: bool,
+    chat_title: str | None = None,
+    writer: FrameWriter | None = None,
+    generate_title: bool = True,
+):
+    """Queue the save of a finished turn, then the generation of its title.
+
+    Appends to one chat run in turn order. Once an append has landed it
+    queues the title job separately, so a slow title call never holds back
+    the next turn's append; once the title is set the socket, if any, gets
+    a `title` event.
+    """
+    conversation_cache.set((user_id, chat_id), messages_dict)
+    title_job = _title_chat_job(writer, list(messages_dict), user_id, chat_id) if generate_title else None
+    await background_jobs.submit(
+        f"save-chat:{chat_id}",
+        _append_chat_job(_unsaved_messages(messages_dict, is_new_chat), user_id, chat_id, model, chat_title, title_job),
+        key=("save-chat", user_id, chat_id),
+    )
 
-    return ChatCompletionResponse(response=ai_response)
 
+def _append_chat_job(
+    new_messages: List[dict], user_id: str, chat_id: str, model: str, chat_title: str | None, title_job=None
+):
+    # Fixed across retries, so a retried append that did land is not applied twice
+    turn_id = generate_id()
 
-def save_chat_conversation(messages_dict: List[ChatMessage], user_id: str, chat_id: str, model: str, chat_title: str = None):
-    chat_message = chats_collection.find_one({"user_id": user_id, "chat_id": chat_id})
+    async def job():
+        await save_chat_conversation(new_messages, user_id, chat_id, model, chat_title, turn_id=turn_id)
+        if title_job:
+            # Queued only now, so the title always finds the chat saved
+            await background_jobs.submit_nowait(
+                f"title-chat:{chat_id}", title_job, key=("title-chat", user_id, chat_id)
+            )
 
-    if chat_message:
-        chats_collection.update_one(
-            {"user_id": user_id, "chat_id": chat_id},
-            {"$set": {"messages": messages_dict, "title": chat_title or chat_message["title"]}},
+    return job
+
+
+def _title_chat_job(writer: FrameWriter | None, messages_dict: List[dict], user_id: str, chat_id: str):
+    state = {}
+
+    async def job():
+        if "title" not in state:
+            state["title"] = await generate_chat_title(
+                messages_dict, keep_alive=model_warmup.keep_alive_for(settings.DEFAULT_MODEL)
+            )
+        if state["title"]:
+            await chats_collection.update_one(
+                {"user_id": user_id, "chat_id": chat_id}, {"$set": {"title": state["title"]}}
+            )
+
+        if writer and writer.websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await writer.send({
+                    "status": "title",
+                    "chat_id": chat_id,
+                    "title": state["title"]
+                })
+            except Exception as e:
+                logging.info(f"Could not deliver title for chat {chat_id}: {str(e)}")
+
+    return job
+
+
+async def create_chat_completion(
+    user_id: str,
+    chat_id: str,
+    messages: List[ChatMessage] | None,
+    model: str = settings.DEFAULT_MODEL,
+    message: ChatMessage | None = None,
+    options: Dict[str, Any] | None = None,
+    use_cache: bool = True,
+) -> ChatCompletionResponse:
+    messages_dict = await resolve_chat_messages(user_id, chat_id, messages, message)
+
+    context = await build_context_window(user_id, chat_id, messages_dict, model)
+    context = await augment_with_documents(user_id, context)
+
+    # Keyed on the context actually sent to the model, so trimmed and
+    # summarized histories still hit when the prompt is the same
+    cache_key = None
+    ai_response = None
+    if use_cache and response_cache.is_cacheable(options):
+        cache_key = response_cache_key(model, context, options)
+        ai_response = await response_cache.get(cache_key)
+    cached = ai_response is not None
+
+    if not cached:
+        async with scheduler.slot(model, user_id or "anonymous"):
+            model_warmup.touch(model)
+            ai_response = await send_chat_to_ollama(context, model, model_warmup.keep_alive_for(model), options)
+        if cache_key:
+            await response_cache.set(cache_key, model, ai_response)
+
+    messages_dict.append({"role": "assistant", "content": ai_response})
+
+    if user_id:
+        is_new_chat = not chat_id
+        chat_id = generate_id() if is_new_chat else chat_id
+        chat_title = None
+        if not cached:
+            # A cache hit answers without waiting on the model; its title is set in the background
+            chat_title = await generate_chat_title(
+                messages_dict, keep_alive=model_warmup.keep_alive_for(settings.DEFAULT_MODEL)
+            )
+        await queue_chat_save(messages_dict, user_id, chat_id, model, is_new_chat, chat_title, generate_title=cached)
+        return ChatCompletionResponse(chat_id=str(chat_id), title=chat_title, response=ai_response, cached=cached)
+
+    return ChatCompletionResponse(response=ai_response, cached=cached)
+
+
+async def resolve_chat_messages(
+    user_id: str | None,
+    chat_id: str | None,
+    messages: List[ChatMessage | dict] | None,
+    message: ChatMessage | dict | None = None,
+) -> List[dict]:
+    """Build the message list for a turn.
+
+    Clients either send the full `messages` history, or only the new `message`
+    together with a `chat_id`, in which case the history is rebuilt server-side.
+    """
+    # Socket clients send plain dicts, so every message is validated here
+    try:
+        if message is not None:
+            new_messages = [ChatMessage.model_validate(message).model_dump()]
+        else:
+            new_messages = [ChatMessage.model_validate(msg).model_dump() for msg in messages or []]
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'message'}: {error['msg']}" for error in e.errors())
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid chat message: {errors}",
         )
+    except TypeError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid chat message: 'messages' must be a list",
+        )
+
+    if message is not None:
+        history = await load_chat_history(user_id, chat_id) if chat_id else []
+        messages_dict = history + new_messages
     else:
-        chat_id = generate_id()
-        chats_collection.insert_one(
-            ChatConversation(
-                user_id=user_id,
-                chat_id=chat_id,
-                title=chat_title or "Untitled",
-                created_at=get_current_time(),
-                model=model,
-                messages=messages_dict,
-            ).model_dump()
+        messages_dict = new_messages
+
+    if not messages_dict or messages_dict[-1]["role"] != "user":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Last message must be from the user",
         )
+    return messages_dict
 
 
-def rename_chat_conversation(user_id: str, chat_id: str, title: str) -> ChatRenameResponse:
-    chat_message = chats_collection.find_one({"user_id": user_id, "chat_id": chat_id})
+async def load_chat_history(user_id: str | None, chat_id: str) -> List[dict]:
+    """Stored messages of a chat, served from the conversation cache when possible."""
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication is required to continue a stored chat",
+        )
+
+    history = conversation_cache.get((user_id, chat_id))
+    if history is None:
+        chat = await chats_collection.find_one(
+            {"user_id": user_id, "chat_id": chat_id}, {"_id": 0, "messages": 1}
+        )
+        if not chat:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Chat section '{chat_id}' not found for user '{user_id}'",
+            )
+        history = chat.get("messages", [])
+        conversation_cache.set((user_id, chat_id), history)
+    return list(history)
+
+
+def _unsaved_messages(messages_dict: List[dict], is_new_chat: bool) -> List[dict]:
+    """Messages of a finished turn that are not stored yet: the whole list for a
+    new chat, otherwise only the latest user message and the assistant reply."""
+    return messages_dict if is_new_chat else messages_dict[-2:]
+
+
+async def save_chat_conversation(
+    new_messages: List[dict], user_id: str, chat_id: str, model: str, chat_title: str = None, turn_id: str = None
+):
+    """Append messages to a chat in a single upsert, creating the chat if needed.
+
+    With a `turn_id` the append is idempotent: the chat records the id of its
+    last appended turn, and an append whose turn is already recorded is
+    skipped. Appends to one chat must then be serialized, as the save jobs are.
+    """
+    query = {"user_id": user_id, "chat_id": chat_id}
+    update = {
+        "$push": {"messages": {"$each": new_messages}},
+        "$setOnInsert": {"created_at": get_current_time(), "model": model},
+    }
+    if chat_title:
+        update["$set"] = {"title": chat_title}
+    else:
+        update["$setOnInsert"]["title"] = "Untitled"
+    if turn_id:
+        query["last_turn_id"] = {"$ne": turn_id}
+        update.setdefault("$set", {})["last_turn_id"] = turn_id
+
+    try:
+        await chats_collection.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        if not turn_id:
+            raise
+        # The chat exists but did not match: this turn was appended by an earlier attempt
+        logging.info(f"Turn {turn_id} of chat {chat_id} was already saved")
+        return
+    # The text index follows the document; embeddings are computed off the request path
+    await index_chat_messages(user_id, chat_id, new_messages)
+
+
+async def rename_chat_conversation(user_id: str, chat_id: str, title: str) -> ChatRenameResponse:
+    chat_message = await chats_collection.find_one({"user_id": user_id, "chat_id": chat_id})
     if chat_message:
-        chats_collection.update_one(
+        await chats_collection.update_one(
             {"user_id": user_id, "chat_id": chat_id},
             {"$set": {"title": title}},
         )
@@ -152,22 +386,111 @@ def rename_chat_conversation(user_id: str, chat_id: str, title: str) -> ChatRena
     )
 
 
-def get_user_chats_collection(user_id: str) -> UserChatsCollection:
-    chats_in_db = list(chats_collection.find({"user_id": user_id}, {"messages": 0}).sort("created_at", -1))
+def _encode_chat_cursor(chat: dict) -> str:
+    payload = json_util.dumps({"c": chat["created_at"], "i": chat["_id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_chat_cursor(cursor: str) -> dict:
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"c": payload["c"], "i": ObjectId(payload["i"])}
+    except (binascii.Error, ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+async def get_user_chats_collection(user_id: str, limit: int = 50, after: str | None = None) -> UserChatsCollection:
+    """One page of a user's chats, newest first.
+
+    Pages are keyed on (created_at, _id) rather than skipped over, and the
+    query is covered by the user_chat_list index, so each page costs the same
+    however many chats the user has.
+    """
+    query = {"user_id": user_id}
+    if after:
+        cursor = _decode_chat_cursor(after)
+        query["$or"] = [
+            {"created_at": {"$lt": cursor["c"]}},
+            {"created_at": cursor["c"], "_id": {"$lt": cursor["i"]}},
+        ]
+
+    chats_in_db = await chats_collection.find(
+        query, {"_id": 1, "chat_id": 1, "title": 1, "created_at": 1, "model": 1}
+    ).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list()
+
+    has_more = len(chats_in_db) > limit
+    chats_in_db = chats_in_db[:limit]
     chat_sections = []
     for chat in chats_in_db:
-        chat["_id"] = str(chat["_id"])
-        if not isinstance(chat["created_at"], str):
-            chat["created_at"] = chat["created_at"].strftime("%Y-%m-%dT%H:%M:%SZ")
-        chat["messages"] = []
-        chat_sections.append(ChatConversation.model_validate(chat))
+        created_at = chat["created_at"]
+        if not isinstance(created_at, str):
+            created_at = created_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        chat_sections.append(ChatSummary(
+            chat_id=chat["chat_id"], title=chat.get("title", "Untitled"), created_at=created_at, model=chat.get("model")
+        ))
 
-    return UserChatsCollection(user_id=user_id, chats=chat_sections)
+    next_cursor = _encode_chat_cursor(chats_in_db[-1]) if has_more else None
+    return UserChatsCollection(user_id=user_id, chats=chat_sections, next_cursor=next_cursor)
 
 
-def get_chat_conversation(user_id: str, chat_id: str) -> ChatConversation:
-    chat_message = chats_collection.find_one({"user_id": user_id, "chat_id": chat_id})
-    if chat_message:
+async def get_chat_conversation(
+    user_id: str,
+    chat_id: str,
+    before: int | None = None,
+    limit: int | None = None,
+    since: int | None = None,
+) -> ChatConversation:
+    """A chat with a range of its messages, sliced server-side.
+
+    Messages are addressed by sequence number, their position in the chat.
+    `before` returns the `limit` messages preceding that sequence number (the
+    latest ones when omitted); `since` returns the messages from that sequence
+    number on, for clients syncing a chat they already hold. Without any
+    range the whole chat is returned.
+    """
+    if before is not None and since is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'before' and 'since' cannot be combined",
+        )
+
+    count = "$message_count"
+    if since is not None:
+        start = {"$min": [since, count]}
+        end = {"$min": [since + limit, count]} if limit else count
+    else:
+        end = {"$min": [before, count]} if before is not None else count
+        start = {"$max": [{"$subtract": [end, limit]}, 0]} if limit else 0
+
+    pipeline = [
+        {"$match": {"user_id": user_id, "chat_id": chat_id}},
+        {"$limit": 1},
+        {"$addFields": {"message_count": {"$size": {"$ifNull": ["$messages", []]}}}},
+        {"$addFields": {"first_seq": start, "end_seq": end}},
+        {"$project": {
+            "_id": 0,
+            "user_id": 1,
+            "chat_id": 1,
+            "title": 1,
+            "created_at": 1,
+            "model": 1,
+            "message_count": 1,
+            "first_seq": 1,
+            "messages": {"$cond": [
+                {"$gt": ["$end_seq", "$first_seq"]},
+                {"$slice": ["$messages", "$first_seq", {"$subtract": ["$end_seq", "$first_seq"]}]},
+                [],
+            ]},
+        }},
+    ]
+    chats = await (await chats_collection.aggregate(pipeline)).to_list()
+    if chats:
+        chat_message = chats[0]
+        if not isinstance(chat_message["created_at"], str):
+            chat_message["created_at"] = chat_message["created_at"].strftime("%Y-%m-%dT%H:%M:%SZ")
         return ChatConversation.model_validate(chat_message)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -175,8 +498,11 @@ def get_chat_conversation(user_id: str, chat_id: str) -> ChatConversation:
     )
 
 
-def delete_chat_conversation(user_id: str, chat_id: str) -> bool:
-    result = chats_collection.delete_one({"user_id": user_id, "chat_id": chat_id})
+async def delete_chat_conversation(user_id: str, chat_id: str) -> bool:
+    result = await chats_collection.delete_one({"user_id": user_id, "chat_id": chat_id})
+    conversation_cache.pop((user_id, chat_id))
+    summary_cache.pop((user_id, chat_id))
+    await delete_chat_index(user_id, chat_id)
     if result.deleted_count == 1:
         return True
     raise HTTPException(
@@ -185,7 +511,11 @@ def delete_chat_conversation(user_id: str, chat_id: str) -> bool:
     )
 
 
-def get_available_models() -> AvailableModelsResponse:
-    models = get_all_ollama_models()
+def get_scheduler_stats() -> SchedulerStatsResponse:
+    return scheduler.stats()
+
+
+async def get_available_models() -> AvailableModelsResponse:
+    models = await model_registry.get_models()
     model_data = [AIModel(name=model.model, size=format_size(model.size)) for model in models]
     return AvailableModelsResponse(models=model_data, total=len(model_data))
@@ -0,0 +1,119 @@
+import logging
+from typing import List, Set, Tuple
+
+from app.config import settings
+from app.database import chats_collection
+from app.utils import LRUCache, parse_model_limits
+from app.services.ollama_service import summarize_conversation
+from app.services.job_service import background_jobs
+from app.services.warmup_service import model_warmup
+
+
+model_budgets = parse_model_limits(settings.MODEL_CONTEXT_BUDGETS)
+
+# Rolling summaries by (user_id, chat_id): (summary, number of leading messages it covers)
+summary_cache = LRUCache(settings.CONVERSATION_CACHE_SIZE)
+_pending_summaries: Set[Tuple[str, str]] = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count, about four characters per token."""
+    return len(text) // 4 + 1
+
+
+def context_budget_for(model: str) -> int:
+    return model_budgets.get(model, settings.CONTEXT_TOKEN_BUDGET)
+
+
+def fit_context_window(
+    messages: List[dict], model: str, summary: str | None = None, summary_upto: int = 0
+) -> Tuple[List[dict], int]:
+    """Select the messages sent to the model for one turn.
+
+    System messages are always kept. Everything before the returned cut index
+    is replaced by the summary. While the turns after `summary_upto` fit the
+    budget the cut stays there, so the prompt prefix is stable between turns
+    and Ollama can reuse its cached prompt evaluation. Once they overflow, the
+    cut moves forward until the recent turns use `CONTEXT_TRIM_RATIO` of the budget.
+    """
+    budget = context_budget_for(model)
+    system = [msg for msg in messages if msg["role"] == "system"]
+    fixed = sum(estimate_tokens(msg["content"]) for msg in system)
+    if summary:
+        fixed += estimate_tokens(summary)
+
+    cut = summary_upto if summary and summary_upto < len(messages) else 0
+    used = fixed + sum(estimate_tokens(msg["content"]) for msg in messages[cut:] if msg["role"] != "system")
+    if used > budget:
+        target = budget * settings.CONTEXT_TRIM_RATIO - fixed
+        used = 0
+        cut = len(messages) - 1  # The new user message is always kept
+        while cut > 0:
+            previous = messages[cut - 1]
+            cost = 0 if previous["role"] == "system" else estimate_tokens(previous["content"])
+            if used + cost > target:
+                break
+            used += cost
+            cut -= 1
+
+    if cut == 0:
+        return messages, 0
+
+    window = list(system)
+    if summary:
+        window.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    window.extend(msg for msg in messages[cut:] if msg["role"] != "system")
+    return window, cut
+
+
+async def build_context_window(user_id: str | None, chat_id: str | None, messages: List[dict], model: str) -> List[dict]:
+    """Fit a stored chat into the model's token budget, refreshing its rolling
+    summary in the background when older turns fall out of the window."""
+    window, cut = fit_context_window(messages, model)
+    if not cut or not (user_id and chat_id):
+        return window
+
+    key = (user_id, chat_id)
+    summary, summary_upto = await load_summary(user_id, chat_id)
+    window, cut = fit_context_window(messages, model, summary, summary_upto)
+
+    if cut > summary_upto and key not in _pending_summaries:
+        _pending_summaries.add(key)
+        await background_jobs.submit(
+            f"summarize-chat:{chat_id}",
+            _summary_job(user_id, chat_id, messages[summary_upto:cut], summary, cut, model),
+        )
+    return window
+
+
+async def load_summary(user_id: str, chat_id: str) -> Tuple[str | None, int]:
+    cached = summary_cache.get((user_id, chat_id))
+    if cached is None:
+        chat = await chats_collection.find_one(
+            {"user_id": user_id, "chat_id": chat_id}, {"_id": 0, "summary": 1, "summary_upto": 1}
+        )
+        chat = chat or {}
+        cached = (chat.get("summary"), chat.get("summary_upto", 0))
+        summary_cache.set((user_id, chat_id), cached)
+    return cached
+
+
+def _summary_job(user_id: str, chat_id: str, dropped: List[dict], summary: str | None, upto: int, model: str):
+    async def job():
+        try:
+            dropped_turns = [msg for msg in dropped if msg["role"] != "system"]
+            new_summary = await summarize_conversation(
+                dropped_turns, summary, model, model_warmup.keep_alive_for(model)
+            )
+            if not new_summary:
+                return
+            await chats_collection.update_one(
+                {"user_id": user_id, "chat_id": chat_id},
+                {"$set": {"summary": new_summary, "summary_upto": upto}},
+            )
+            summary_cache.set((user_id, chat_id), (new_summary, upto))
+            logging.info(f"Updated summary of chat {chat_id} up to message {upto}")
+        finally:
+            _pending_summaries.discard((user_id, chat_id))
+
+    return job
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Set
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.database import documents_collection, document_chunks_collection
+from app.models.document import DocumentListResponse, DocumentResponse
+from app.utils import generate_id, get_current_time, LRUCache, MmapVectorStore
+from app.utils.vector_index import np
+from app.services.embedding_service import embedding_batcher
+from app.services.job_service import background_jobs
+
+# Open vector stores by user; each is a memory map over the user's directory
+vector_stores = LRUCache(settings.SEARCH_INDEX_CACHE_SIZE)
+_ingest_locks: Dict[str, asyncio.Lock] = {}
+_pending_index_builds: Set[str] = set()
+
+
+def rag_available() -> bool:
+    return settings.RAG_ENABLED and np is not None
+
+
+def chunk_text(text: str, size: int, overlap: int) -> List[str]:
+    """Split text into windows of about `size` characters overlapping by `overlap`,
+    cutting at a paragraph, line or word break when there is one near the end."""
+    text = text.strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, start + size // 2, end)
+                if cut > 0:
+                    end = cut
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end == len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+async def _vector_store(user_id: str) -> MmapVectorStore:
+    """The user's store with the rows and index other processes wrote since it was opened.
+
+    Opening and refreshing read files, so both run off the event loop.
+    """
+    store = vector_stores.get(user_id)
+    if store is None:
+        store = await asyncio.to_thread(
+            MmapVectorStore, os.path.join(settings.RAG_DATA_DIR, user_id), settings.RAG_INDEX_MIN_ROWS
+        )
+        vector_stores.set(user_id, store)
+    else:
+        await asyncio.to_thread(store.refresh)
+    return store
+
+
+def _check_available():
+    if not rag_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document retrieval is not enabled",
+        )
+
+
+async def ingest_document(user_id: str, title: str, text: str) -> DocumentResponse:
+    _check_available()
+    chunks = chunk_text(text, settings.RAG_CHUNK_CHARS, settings.RAG_CHUNK_OVERLAP)
+    if not chunks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document has no text",
+        )
+
+    # The batcher splits the chunks into EMBEDDING_BATCH_SIZE calls
+    vectors = await embedding_batcher.embed(chunks)
+    document_id = generate_id()
+    created_at = get_current_time()
+
+    # The store numbers rows from its file; the lock keeps this worker's appends in order
+    async with _ingest_locks.setdefault(user_id, asyncio.Lock()):
+        store = await _vector_store(user_id)
+        first_row = await asyncio.to_thread(store.append, vectors)
+        await document_chunks_collection.insert_many([
+            {"user_id": user_id, "document_id": document_id, "row": first_row + offset, "text": chunk}
+            for offset, chunk in enumerate(chunks)
+        ])
+    await documents_collection.insert_one({
+        "user_id": user_id,
+        "document_id": document_id,
+        "title": title,
+        "chunks": len(chunks),
+        "created_at": created_at,
+    })
+
+    if store.needs_index and user_id not in _pending_index_builds:
+        _pending_index_builds.add(user_id)
+        await background_jobs.submit(f"rag-index:{user_id}", _build_index_job(user_id, store))
+
+    return DocumentResponse(document_id=document_id, title=title, chunks=len(chunks), created_at=created_at)
+
+
+def _build_index_job(user_id: str, store: MmapVectorStore):
+    async def job():
+        try:
+            # Rows appended during the build are scanned until the next one
+            await asyncio.to_thread(store.build_index)
+            logging.info(f"Built vector index of {store.indexed_rows} rows for user {user_id}")
+        finally:
+            _pending_index_builds.discard(user_id)
+
+    return job
+
+
+async def list_documents(user_id: str) -> DocumentListResponse:
+    documents = await documents_collection.find(
+        {"user_id": user_id}, {"_id": 0, "document_id": 1, "title": 1, "chunks": 1, "created_at": 1}
+    ).sort("created_at", -1).to_list()
+    return DocumentListResponse(
+        documents=[DocumentResponse.model_validate(document) for document in documents], total=len(documents)
+    )
+
+
+async def delete_document(user_id: str, document_id: str) -> bool:
+    """Delete a document. Its vectors stay in the store but no longer resolve to a chunk."""
+    result = await documents_collection.delete_one({"user_id": user_id, "document_id": document_id})
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document '{document_id}' not found for user '{user_id}'",
+        )
+    await document_chunks_collection.delete_many({"user_id": user_id, "document_id": document_id})
+    return True
+
+
+async def retrieve_chunks(user_id: str, query: str, k: int) -> List[str]:
+    """Text of the `k` stored chunks most similar to `query`."""
+    store = await _vector_store(user_id)
+    if store.count == 0:
+        return []
+    [query_vector] = await embedding_batcher.embed([query])
+    # Over-fetch so chunks of deleted documents can be skipped
+    hits = await asyncio.to_thread(store.search, query_vector, k * 2, settings.RAG_INDEX_PROBES)
+    rows = [row for row, score in hits if score >= settings.RAG_MIN_SCORE]
+    if not rows:
+        return []
+
+    chunks = await document_chunks_collection.find(
+        {"user_id": user_id, "row": {"$in": rows}}, {"_id": 0, "row": 1, "text": 1}
+    ).to_list()
+    text_by_row = {chunk["row"]: chunk["text"] for chunk in chunks}
+    return [text_by_row[row] for row in rows if row in text_by_row][:k]
+
+
+async def augment_with_documents(user_id: str | None, messages: List[dict]) -> List[dict]:
+    """Insert the user's most relevant document chunks just before the latest message.
+
+    Earlier messages are left untouched, so the prompt prefix Ollama may have
+    cached stays valid.
+    """
+    if not user_id or not rag_available():
+        return messages
+    try:
+        chunks = await retrieve_chunks(user_id, messages[-1]["content"], settings.RAG_TOP_K)
+    except HTTPException as e:
+        # Answer without documents rather than failing the turn
+        logging.warning(f"Document retrieval failed: {e.detail}")
+        return messages
+    if not chunks:
+        return messages
+
+    excerpts = "\n\n---\n\n".join(chunks)
+    context = {
+        "role": "system",
+        "content": (
+            "The following excerpts from the user's documents may help answer the next message. "
+            "Use them only if they are relevant.\n\n" + excerpts
+        ),
+    }
+    return messages[:-1] + [context] + messages[-1:]
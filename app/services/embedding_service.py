@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+from array import array
+from typing import Dict, List, Set, Tuple
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.utils import LRUCache
+from app.services.ollama_service import embed_texts_with_ollama
+from app.services.metrics_service import Counter, Histogram
+
+embedding_batch_size = Histogram(
+    "embedding_batch_size", "Texts sent to Ollama per embedding call", ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+def embedding_key(model: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+class EmbeddingBatcher:
+    """Merges concurrent embedding requests into batched Ollama calls.
+
+    Texts wait at most `max_delay` seconds, or until `max_batch` texts of the
+    same model are queued, and are then embedded in one call whose results are
+    handed back to each caller. Vectors are cached by a hash of model and
+    text, and a text already queued or in flight is never sent twice.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float, cache_size: int):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.cache = LRUCache(cache_size)
+        self._queues: Dict[str, List[Tuple[str, bytes, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._in_flight: Dict[bytes, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str], model: str = settings.EMBEDDING_MODEL) -> List[List[float]]:
+        results: List[array | asyncio.Future] = []
+        for text in texts:
+            key = embedding_key(model, text)
+            vector = self.cache.get(key)
+            if vector is None:
+                vector = self._in_flight.get(key) or self._enqueue(model, text, key)
+            results.append(vector)
+
+        futures = [result for result in results if isinstance(result, asyncio.Future)]
+        if futures:
+            # Shielded: a caller giving up must not cancel a batch others wait on
+            await asyncio.gather(*(asyncio.shield(future) for future in futures))
+        return [
+            list(result.result() if isinstance(result, asyncio.Future) else result)
+            for result in results
+        ]
+
+    def _enqueue(self, model: str, text: str, key: bytes) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        queue = self._queues.setdefault(model, [])
+        queue.append((text, key, future))
+        if len(queue) >= self.max_batch:
+            self._flush(model)
+        elif model not in self._timers:
+            self._timers[model] = loop.call_later(self.max_delay, self._flush, model)
+        return future
+
+    def _flush(self, model: str):
+        timer = self._timers.pop(model, None)
+        if timer:
+            timer.cancel()
+        batch = self._queues.pop(model, [])
+        if batch:
+            task = asyncio.create_task(self._run(model, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, model: str, batch: List[Tuple[str, bytes, asyncio.Future]]):
+        embedding_batch_size.observe(len(batch), model)
+        error: Exception | None = None
+        try:
+            vectors = await embed_texts_with_ollama([text for text, _, _ in batch], model)
+            if len(vectors) != len(batch):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Ollama returned {len(vectors)} embeddings for {len(batch)} texts",
+                )
+            for (_, key, future), vector in zip(batch, vectors):
+                # float32 arrays take a fraction of the memory of lists of floats
+                vector = array("f", vector)
+                self.cache.set(key, vector)
+                self._in_flight.pop(key, None)
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            error = e
+        finally:
+            # Whatever went wrong, no caller is left waiting on a key that stays in flight
+            for _, key, future in batch:
+                self._in_flight.pop(key, None)
+                if future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+
+
+embedding_batcher = EmbeddingBatcher(
+    settings.EMBEDDING_BATCH_SIZE,
+    settings.EMBEDDING_BATCH_DELAY_MS / 1000,
+    settings.EMBEDDING_CACHE_SIZE,
+)
+
+Counter(
+    "embedding_cache_lookups_total", "Embedding cache lookups", ["result"],
+    collect=lambda: {("hit",): embedding_batcher.cache.hits, ("miss",): embedding_batcher.cache.misses},
+)
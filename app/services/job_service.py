@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Tuple
+
+from app.config import settings
+from app.services.metrics_service import Counter, Gauge
+
+background_job_failures = Counter("background_job_failures_total", "Background jobs that failed after all retries")
+background_jobs_dropped = Counter("background_jobs_dropped_total", "Background jobs dropped because the queue was full")
+
+
+Job = Callable[[], Awaitable[None]]
+
+
+class BackgroundJobPipeline:
+    """Bounded asyncio queue of jobs that run off the request path with retries.
+
+    Jobs submitted with the same `key` run one at a time in submission order,
+    whichever worker picks them up; jobs without a key run concurrently.
+    """
+
+    def __init__(self, workers: int, max_queue: int, max_retries: int, retry_delay: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[Tuple[str, Job, Hashable | None]] | None = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs waiting behind the running job of their key
+        self._ordered: Dict[Hashable, Deque[Tuple[str, Job]]] = {}
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Dropping {self._queue.qsize()} background jobs on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, name: str, job: Job, key: Hashable | None = None):
+        """Queue a job, waiting for room when the queue is full."""
+        if self._queue is None:
+            # Pipeline not running (e.g. outside the app lifespan): run inline
+            await self._run(name, job)
+            return
+        await self._queue.put((name, job, key))
+
+    async def submit_nowait(self, name: str, job: Job, key: Hashable | None = None) -> bool:
+        """Queue a job unless the queue is full, in which case it is dropped.
+
+        Jobs that queue follow-up work must use this instead of `submit`: a
+        worker waiting for room in a full queue may be the one that would
+        have made room. Returns whether the job was queued.
+        """
+        if self._queue is None:
+            await self._run(name, job)
+            return True
+        try:
+            self._queue.put_nowait((name, job, key))
+        except asyncio.QueueFull:
+            background_jobs_dropped.inc()
+            logging.warning(f"Background job queue is full, dropped job {name}")
+            return False
+        return True
+
+    async def _worker(self):
+        while True:
+            name, job, key = await self._queue.get()
+            if key is None:
+                await self._run_queued(name, job)
+            elif key in self._ordered:
+                # Another worker is running this key's jobs and runs this one next
+                self._ordered[key].append((name, job))
+            else:
+                pending = self._ordered[key] = deque([(name, job)])
+                try:
+                    while pending:
+                        await self._run_queued(*pending.popleft())
+                finally:
+                    del self._ordered[key]
+
+    async def _run_queued(self, name: str, job: Job):
+        try:
+            await self._run(name, job)
+        finally:
+            self._queue.task_done()
+
+    async def _run(self, name: str, job: Job):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await job()
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    background_job_failures.inc()
+                    logging.error(f"Background job {name} failed after {attempt} attempts: {str(e)}", exc_info=True)
+                    return
+                logging.warning(f"Background job {name} failed (attempt {attempt}): {str(e)}")
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+
+background_jobs = BackgroundJobPipeline(
+    settings.JOB_WORKERS,
+    settings.JOB_QUEUE_SIZE,
+    settings.JOB_MAX_RETRIES,
+    settings.JOB_RETRY_DELAY_SECONDS,
+)
+
+Gauge(
+    "background_jobs_queue_depth", "Jobs waiting in the background pipeline",
+    collect=lambda: {(): background_jobs.depth},
+)
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, List, Set
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.services.ollama_service import get_all_ollama_models
+
+
+class ModelRegistry:
+    """In-memory copy of Ollama's model list, refreshed with stale-while-revalidate.
+
+    Readers always get the cached list; once it is older than the TTL a single
+    background refresh is started and the stale list is served meanwhile.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.etag: str | None = None
+        self._models: List[Any] = []
+        self._names: Set[str] = set()
+        self._fetched_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._fetched_at > 0
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.ttl
+
+    async def refresh(self):
+        models = await get_all_ollama_models()
+        names = set()
+        for model in models:
+            names.add(model.model)
+            if model.model.endswith(":latest"):
+                names.add(model.model[: -len(":latest")])
+
+        fingerprint = "|".join(sorted(f"{model.model}:{model.digest}:{model.size}" for model in models))
+        self.etag = f'"{hashlib.sha1(fingerprint.encode()).hexdigest()}"'
+        self._models = models
+        self._names = names
+        self._fetched_at = time.monotonic()
+
+    async def get_models(self) -> List[Any]:
+        if not self.is_loaded:
+            await self.refresh()
+        elif self.is_stale:
+            self._refresh_in_background()
+        return self._models
+
+    async def is_known(self, model: str) -> bool:
+        if model in self._names:
+            if self.is_stale:
+                self._refresh_in_background()
+            return True
+
+        if not self.is_loaded or self.is_stale:
+            # The model may have been pulled since the last refresh
+            try:
+                await self.refresh()
+            except HTTPException:
+                # Ollama is unreachable: let the request fail on its own
+                return True
+        return model in self._names
+
+    async def validate(self, model: str):
+        if not await self.is_known(model):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown model '{model}'",
+            )
+
+    async def start(self):
+        try:
+            await self.refresh()
+        except HTTPException as e:
+            logging.warning(f"Could not load Ollama models at startup: {e.detail}")
+
+    async def stop(self):
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+
+    def _refresh_in_background(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._safe_refresh())
+
+    async def _safe_refresh(self):
+        try:
+            await self.refresh()
+        except HTTPException as e:
+            logging.warning(f"Failed to refresh Ollama models: {e.detail}")
+
+
+model_registry = ModelRegistry(settings.MODEL_LIST_TTL_SECONDS)
@@ -1,45 +1,123 @@
 import logging
-from typing import List, Dict, Any
+import time
+from typing import AsyncGenerator, List, Dict, Any
 import ollama
 from fastapi import HTTPException, status
 
 from app.models.chat import ChatMessage
 from app.config import settings
-
-
-def stream_chat_to_ollama(
+from app.services.metrics_service import Counter, Histogram, timed
+
+
+ollama_request_duration = Histogram(
+    "ollama_request_duration_seconds", "Duration of Ollama calls", ["operation", "model"]
+)
+ollama_errors = Counter("ollama_errors_total", "Failed Ollama calls", ["operation", "model"])
+ollama_streams_cancelled = Counter(
+    "ollama_streams_cancelled_total", "Streamed generations closed before Ollama finished", ["model"]
+)
+ollama_time_to_first_chunk = Histogram(
+    "ollama_time_to_first_chunk_seconds", "Time until the first streamed chunk", ["model"]
+)
+ollama_model_load = Histogram(
+    "ollama_model_load_seconds", "Time Ollama spent loading the model into memory", ["model"]
+)
+ollama_generation = Histogram(
+    "ollama_generation_seconds", "Time Ollama spent evaluating the prompt and generating", ["model"]
+)
+ollama_tokens_per_second = Histogram(
+    "ollama_tokens_per_second", "Generation speed reported by Ollama", ["model"],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300),
+)
+
+
+# Shared async client: reads from Ollama happen on the event loop without
+# blocking it, so concurrent requests never stall each other.
+async_client = ollama.AsyncClient()
+
+
+def _record_durations(response, model: str):
+    """Report load time separately from generation time, from Ollama's own timings."""
+    if response.get("load_duration"):
+        ollama_model_load.observe(response["load_duration"] / 1e9, model)
+    generation = (response.get("prompt_eval_duration") or 0) + (response.get("eval_duration") or 0)
+    if generation:
+        ollama_generation.observe(generation / 1e9, model)
+    if response.get("eval_duration"):
+        ollama_tokens_per_second.observe(response["eval_count"] / (response["eval_duration"] / 1e9), model)
+
+
+async def stream_chat_to_ollama(
     messages: List[ChatMessage],
-    model: str = settings.DEFAULT_MODEL
-):
+    model: str = settings.DEFAULT_MODEL,
+    keep_alive: str | None = None,
+    options: Dict[str, Any] | None = None,
+) -> AsyncGenerator[str, None]:
     messages_dict = [
         msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages
     ]
 
+    start_time = time.perf_counter()
+    first_chunk = True
+    finished = False
+    stream = None
     try:
-        response_parts = []
-        for chunk in ollama.chat(model=model, messages=messages_dict, stream=True):
+        stream = await async_client.chat(
+            model=model,
+            messages=messages_dict,
+            stream=True,
+            keep_alive=keep_alive or settings.OLLAMA_KEEP_ALIVE,
+            options=options,
+        )
+        async for chunk in stream:
+            if chunk.get('done'):
+                finished = True
+                _record_durations(chunk, model)
+
             content = chunk.get('message', {}).get('content', '')
             if content:
-                response_parts.append(content)
-
-                if len(response_parts) >= 3:  # Gộp lại rồi gửi để tiết kiệm
-                    yield ''.join(response_parts)
-                    response_parts.clear()
-
-        if response_parts:
-            yield ''.join(response_parts)
+                if first_chunk:
+                    ollama_time_to_first_chunk.observe(time.perf_counter() - start_time, model)
+                    first_chunk = False
+                # Batching into frames is left to the caller (see app.utils.coalesce)
+                yield content
 
     except Exception as e:
-        yield f"ERROR: {str(e)}"  # Send error message to the client
+        ollama_errors.inc("chat_stream", model)
+        finished = True  # Counted as an error rather than a cancellation
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to communicate with Ollama service: {str(e)}",
+        )
+    finally:
+        if stream is not None:
+            # Closing the HTTP response is what makes Ollama stop generating
+            # when the caller abandons the stream early
+            await stream.aclose()
+            if not finished:
+                ollama_streams_cancelled.inc(model)
+        ollama_request_duration.observe(time.perf_counter() - start_time, "chat_stream", model)
 
 
-def send_chat_to_ollama(messages: List[ChatMessage], model: str = settings.DEFAULT_MODEL) -> str:
+async def send_chat_to_ollama(
+    messages: List[ChatMessage],
+    model: str = settings.DEFAULT_MODEL,
+    keep_alive: str | None = None,
+    options: Dict[str, Any] | None = None,
+) -> str:
     messages_dict = [
         msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages
     ]
 
     try:
-        response = ollama.chat(model=model, messages=messages_dict)
+        with timed(ollama_request_duration, "chat", model, errors=ollama_errors):
+            response = await async_client.chat(
+                model=model,
+                messages=messages_dict,
+                keep_alive=keep_alive or settings.OLLAMA_KEEP_ALIVE,
+                options=options,
+            )
+        _record_durations(response, model)
         return response["message"]["content"]
     except Exception as e:
         raise HTTPException(
@@ -48,7 +126,9 @@ def send_chat_to_ollama(messages: List[ChatMessage], model: str = settings.DEFAU
         )
 
 
-def generate_chat_title(messages: List[ChatMessage], model: str = settings.DEFAULT_MODEL) -> str | None:
+async def generate_chat_title(
+    messages: List[ChatMessage], model: str = settings.DEFAULT_MODEL, keep_alive: str | None = None
+) -> str | None:
     messages_dict = [
         msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages
     ]
@@ -72,16 +152,87 @@ def generate_chat_title(messages: List[ChatMessage], model: str = settings.DEFAU
     })
 
     try:
-        response = ollama.chat(model=model, messages=messages_dict)
+        with timed(ollama_request_duration, "title", model, errors=ollama_errors):
+            response = await async_client.chat(
+                model=model, messages=messages_dict, keep_alive=keep_alive or settings.OLLAMA_KEEP_ALIVE
+            )
         return response["message"]["content"].replace('"', '')
     except Exception as e:
         logging.error(f"Failed to generate title: {str(e)}", exc_info=True)
         return None
 
 
-def get_all_ollama_models() -> List[Dict[str, Any]]:
+async def summarize_conversation(
+    messages: List[ChatMessage],
+    previous_summary: str | None = None,
+    model: str = settings.DEFAULT_MODEL,
+    keep_alive: str | None = None,
+) -> str | None:
+    """Fold older conversation turns into a rolling summary."""
+    messages_dict = [
+        msg.model_dump() if isinstance(msg, ChatMessage) else msg for msg in messages
+    ]
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages_dict)
+    prompt = (
+        "Summarize the conversation below so it can replace the original messages as context. "
+        "Keep facts, names, decisions and open questions. "
+        "Use the same language as the conversation. "
+        "Answer with the summary only.\n\n"
+    )
+    if previous_summary:
+        prompt += f"Summary of the earlier conversation:\n{previous_summary}\n\n"
+    prompt += f"Conversation:\n{transcript}"
+
+    try:
+        with timed(ollama_request_duration, "summary", model, errors=ollama_errors):
+            response = await async_client.chat(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                keep_alive=keep_alive or settings.OLLAMA_KEEP_ALIVE,
+            )
+        return response["message"]["content"].strip()
+    except Exception as e:
+        logging.error(f"Failed to summarize conversation: {str(e)}", exc_info=True)
+        return None
+
+
+async def embed_texts_with_ollama(texts: List[str], model: str = settings.EMBEDDING_MODEL) -> List[List[float]]:
+    """Embedding vectors of `texts`, computed in one Ollama call."""
+    try:
+        with timed(ollama_request_duration, "embed", model, errors=ollama_errors):
+            response = await async_client.embed(
+                model=model, input=texts, keep_alive=settings.OLLAMA_KEEP_ALIVE
+            )
+        return response["embeddings"]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to compute embeddings with Ollama: {str(e)}",
+        )
+
+
+async def preload_ollama_model(model: str, keep_alive: str) -> float:
+    """Load a model without generating anything and return the load time in seconds.
+
+    Also used on a loaded model to change how long Ollama keeps it in memory.
+    """
+    with timed(ollama_request_duration, "preload", model, errors=ollama_errors):
+        response = await async_client.chat(model=model, messages=[], keep_alive=keep_alive)
+    _record_durations(response, model)
+    return (response.get("load_duration") or 0) / 1e9
+
+
+async def get_loaded_ollama_models() -> List[str]:
+    """Names of the models Ollama currently holds in memory."""
+    with timed(ollama_request_duration, "ps", "", errors=ollama_errors):
+        response = await async_client.ps()
+    return [model.model for model in response.models]
+
+
+async def get_all_ollama_models() -> List[Dict[str, Any]]:
     try:
-        response = ollama.list()
+        with timed(ollama_request_duration, "list", "", errors=ollama_errors):
+            response = await async_client.list()
         return response.models
     except Exception as e:
         raise HTTPException(
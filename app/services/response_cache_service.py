@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.database import response_cache_collection
+from app.utils import LRUCache
+from app.services.job_service import background_jobs
+from app.services.metrics_service import Counter
+
+response_cache_lookups = Counter(
+    "response_cache_lookups_total", "Response cache lookups", ["tier", "result"]
+)
+
+
+def response_cache_key(model: str, messages: List[dict], options: Dict[str, Any] | None) -> str:
+    """Hash of the canonical JSON form of a generation request."""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": [{"role": msg["role"], "content": msg["content"]} for msg in messages],
+            "options": options or {},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def is_deterministic(options: Dict[str, Any] | None) -> bool:
+    """Only greedy decoding gives the same answer for the same prompt."""
+    return bool(options) and options.get("temperature") == 0
+
+
+class ResponseCache:
+    """Exact-match cache of model answers, in memory with an optional MongoDB tier.
+
+    The in-memory tier is local to the worker; the MongoDB tier lets workers
+    share answers and survives restarts, and expires through a TTL index.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: float, use_mongo: bool):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.use_mongo = use_mongo
+        self._memory = LRUCache(maxsize, ttl=ttl)
+
+    def is_cacheable(self, options: Dict[str, Any] | None) -> bool:
+        return self.enabled and is_deterministic(options)
+
+    async def get(self, key: str) -> str | None:
+        response = self._memory.get(key)
+        if response is not None:
+            response_cache_lookups.inc("memory", "hit")
+            return response
+        response_cache_lookups.inc("memory", "miss")
+
+        if not self.use_mongo:
+            return None
+        try:
+            document = await response_cache_collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}, {"response": 1}
+            )
+        except PyMongoError as e:
+            logging.warning(f"Response cache lookup failed: {str(e)}")
+            return None
+        if document is None:
+            response_cache_lookups.inc("mongo", "miss")
+            return None
+        response_cache_lookups.inc("mongo", "hit")
+        self._memory.set(key, document["response"])
+        return document["response"]
+
+    async def set(self, key: str, model: str, response: str):
+        self._memory.set(key, response)
+        if self.use_mongo:
+            await background_jobs.submit(f"response-cache:{key[:12]}", self._store_job(key, model, response))
+
+    def _store_job(self, key: str, model: str, response: str):
+        async def job():
+            now = datetime.now(timezone.utc)
+            await response_cache_collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "model": model,
+                    "response": response,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl),
+                }},
+                upsert=True,
+            )
+
+        return job
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_ENABLED,
+    settings.RESPONSE_CACHE_SIZE,
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_MONGO,
+)
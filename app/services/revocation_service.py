@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.database import token_blacklist
+
+
+def token_id(payload: dict, token: str) -> str:
+    """Revocation key of a token: its `jti`, or a digest for tokens issued without one."""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationCache:
+    """In-process set of revoked token ids, kept until each token's own expiry.
+
+    token_blacklist stays the source of truth; every worker polls it for
+    entries revoked since its last sync, so a logout reaches all workers
+    within REVOCATION_SYNC_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._synced_until: datetime | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, jti: str, expires_at: float):
+        self._revoked[jti] = expires_at
+
+    async def revoke(self, jti: str, expires_at: datetime):
+        self.add(jti, expires_at.timestamp())
+        await token_blacklist.update_one(
+            {"jti": jti},
+            {"$set": {"expires_at": expires_at, "revoked_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
+    async def sync(self):
+        now = datetime.now(timezone.utc)
+        if self._synced_until is None:
+            # Full load of everything that has not expired yet, legacy entries included
+            query = {"expires_at": {"$gt": now}}
+        else:
+            # Overlap one interval to tolerate clock skew between workers
+            query = {"revoked_at": {"$gte": self._synced_until - timedelta(seconds=self.sync_interval)}}
+
+        async for entry in token_blacklist.find(query, {"_id": 0, "jti": 1, "token": 1, "expires_at": 1}):
+            jti = entry.get("jti") or token_id({}, entry.get("token", ""))
+            expires_at = entry["expires_at"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            self.add(jti, expires_at.timestamp())
+        self._synced_until = now
+        self.purge()
+
+    def purge(self):
+        now = time.time()
+        for jti in [jti for jti, expires_at in self._revoked.items() if expires_at <= now]:
+            del self._revoked[jti]
+
+    async def start(self):
+        try:
+            await self.sync()
+        except PyMongoError as e:
+            logging.error(f"Failed to load revoked tokens: {str(e)}")
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except PyMongoError as e:
+                logging.warning(f"Failed to sync revoked tokens: {str(e)}")
+
+
+revocation_cache = RevocationCache(settings.REVOCATION_SYNC_INTERVAL_SECONDS)
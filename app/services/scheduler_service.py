@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.models.chat import ModelQueueStats, SchedulerStatsResponse
+from app.utils import parse_model_limits
+from app.services.metrics_service import Counter, Gauge, Histogram
+
+scheduler_wait = Histogram("scheduler_wait_seconds", "Time spent waiting for a generation slot", ["model"])
+
+
+class ModelQueue:
+    """Bounded wait queue for one model, served round-robin between users."""
+
+    def __init__(self, model: str, concurrency: int, max_queue: int):
+        self.model = model
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.served = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()
+
+    async def acquire(self, user_key: str):
+        if self.active < self.concurrency and not self.queued:
+            self.active += 1
+            self._record_wait(0.0)
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Too many pending requests for model '{self.model}'",
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        if user_key not in self._waiters:
+            self._waiters[user_key] = deque()
+            self._turns.append(user_key)
+        self._waiters[user_key].append(future)
+        self.queued += 1
+
+        started = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled: pass it on
+                self.release()
+            else:
+                self._discard(user_key, future)
+            raise
+        self._record_wait(time.perf_counter() - started)
+
+    def release(self):
+        while self._turns:
+            user_key = self._turns.popleft()
+            waiters = self._waiters[user_key]
+            future = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._turns.append(user_key)
+            else:
+                del self._waiters[user_key]
+            if not future.done():
+                # Hand the slot straight to the next user, active count is unchanged
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, user_key: str, future: asyncio.Future):
+        waiters = self._waiters.get(user_key)
+        if not waiters or future not in waiters:
+            return
+        waiters.remove(future)
+        self.queued -= 1
+        if not waiters:
+            del self._waiters[user_key]
+            self._turns.remove(user_key)
+
+    def _record_wait(self, waited: float):
+        scheduler_wait.observe(waited, self.model)
+        self.served += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> ModelQueueStats:
+        return ModelQueueStats(
+            model=self.model,
+            concurrency=self.concurrency,
+            active=self.active,
+            queued=self.queued,
+            served=self.served,
+            rejected=self.rejected,
+            avg_wait_seconds=self.total_wait / self.served if self.served else 0.0,
+            max_wait_seconds=self.max_wait,
+        )
+
+
+class ModelScheduler:
+    """Limits concurrent Ollama generations per model."""
+
+    def __init__(self, default_concurrency: int, limits: Dict[str, int], max_queue: int):
+        self.default_concurrency = max(default_concurrency, 1)
+        self.limits = limits
+        self.max_queue = max_queue
+        self._queues: Dict[str, ModelQueue] = {}
+
+    def queue_for(self, model: str) -> ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            concurrency = self.limits.get(model, self.default_concurrency)
+            queue = self._queues[model] = ModelQueue(model, concurrency, self.max_queue)
+        return queue
+
+    @asynccontextmanager
+    async def slot(self, model: str, user_key: str) -> AsyncIterator[None]:
+        queue = self.queue_for(model)
+        await queue.acquire(user_key)
+        try:
+            yield
+        finally:
+            queue.release()
+
+    def stats(self) -> SchedulerStatsResponse:
+        return SchedulerStatsResponse(
+            models=[queue.stats() for queue in self._queues.values()]
+        )
+
+
+scheduler = ModelScheduler(
+    settings.OLLAMA_NUM_PARALLEL,
+    parse_model_limits(settings.MODEL_CONCURRENCY),
+    settings.SCHEDULER_MAX_QUEUE,
+)
+
+Gauge(
+    "scheduler_active", "Generations currently running", ["model"],
+    collect=lambda: {(model,): queue.active for model, queue in scheduler._queues.items()},
+)
+Gauge(
+    "scheduler_queue_depth", "Requests waiting for a generation slot", ["model"],
+    collect=lambda: {(model,): queue.queued for model, queue in scheduler._queues.items()},
+)
+Counter(
+    "scheduler_rejected_total", "Requests rejected because the queue was full", ["model"],
+    collect=lambda: {(model,): queue.rejected for model, queue in scheduler._queues.items()},
+)
@@ -0,0 +1,174 @@
+import re
+from typing import Dict, List
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.database import chats_collection, chat_embeddings_collection
+from app.models.chat import ChatSearchHit, ChatSearchResponse
+from app.utils import LRUCache, VectorIndex
+from app.utils.vector_index import np
+from app.services.embedding_service import embedding_batcher
+from app.services.job_service import background_jobs
+
+SNIPPET_CHARS = 160
+
+# Vector index of each user's messages, loaded from chat_embeddings on first use
+vector_indexes = LRUCache(settings.SEARCH_INDEX_CACHE_SIZE)
+
+
+def semantic_search_available() -> bool:
+    return settings.SEARCH_SEMANTIC_ENABLED and np is not None
+
+
+def _snippet(text: str, terms: List[str]) -> str:
+    """A window of `text` around the first search term it contains."""
+    position = -1
+    lowered = text.lower()
+    for term in terms:
+        position = lowered.find(term.lower())
+        if position >= 0:
+            break
+    start = max(position - SNIPPET_CHARS // 4, 0) if position >= 0 else 0
+    snippet = text[start:start + SNIPPET_CHARS].strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if start + SNIPPET_CHARS < len(text) else "")
+
+
+def _format_created_at(value) -> str:
+    return value if isinstance(value, str) else value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def search_chats(user_id: str, query: str, mode: str = "text", limit: int = 20) -> ChatSearchResponse:
+    if mode == "semantic":
+        if not semantic_search_available():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Semantic search is not enabled",
+            )
+        results = await _semantic_search(user_id, query, limit)
+    else:
+        results = await _text_search(user_id, query, limit)
+    return ChatSearchResponse(query=query, mode=mode, results=results)
+
+
+async def _text_search(user_id: str, query: str, limit: int) -> List[ChatSearchHit]:
+    """Rank chats with the user_chat_text index; only the best matching message leaves the server."""
+    terms = [term for term in re.findall(r"\w+", query) if term]
+    if not terms:
+        return []
+    pattern = "|".join(re.escape(term) for term in terms)
+
+    pipeline = [
+        {"$match": {"user_id": user_id, "$text": {"$search": query}}},
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": limit},
+        {"$project": {
+            "_id": 0,
+            "chat_id": 1,
+            "title": 1,
+            "created_at": 1,
+            "score": {"$meta": "textScore"},
+            "match": {"$arrayElemAt": [{"$filter": {
+                "input": {"$ifNull": ["$messages", []]},
+                "as": "message",
+                "cond": {"$regexMatch": {"input": "$$message.content", "regex": pattern, "options": "i"}},
+            }}, 0]},
+        }},
+    ]
+    chats = await (await chats_collection.aggregate(pipeline)).to_list()
+    return [
+        ChatSearchHit(
+            chat_id=chat["chat_id"],
+            title=chat.get("title", "Untitled"),
+            created_at=_format_created_at(chat["created_at"]),
+            snippet=_snippet(chat["match"]["content"], terms) if chat.get("match") else "",
+            score=chat["score"],
+        )
+        for chat in chats
+    ]
+
+
+async def _load_vector_index(user_id: str) -> VectorIndex:
+    index = vector_indexes.get(user_id)
+    if index is None:
+        index = VectorIndex()
+        ids, vectors = [], []
+        async for entry in chat_embeddings_collection.find(
+            {"user_id": user_id, "model": settings.EMBEDDING_MODEL}, {"_id": 0, "chat_id": 1, "content": 1, "vector": 1}
+        ):
+            ids.append((entry["chat_id"], entry["content"]))
+            vectors.append(entry["vector"])
+        index.add(ids, vectors)
+        vector_indexes.set(user_id, index)
+    return index
+
+
+async def _semantic_search(user_id: str, query: str, limit: int) -> List[ChatSearchHit]:
+    index = await _load_vector_index(user_id)
+    [query_vector] = await embedding_batcher.embed([query])
+
+    # Several messages of one chat may match; keep each chat's best one
+    best: Dict[str, tuple] = {}
+    for (chat_id, content), score in index.search(query_vector, limit * 5):
+        if chat_id not in best:
+            best[chat_id] = (content, score)
+        if len(best) == limit:
+            break
+    if not best:
+        return []
+
+    chats = await chats_collection.find(
+        {"user_id": user_id, "chat_id": {"$in": list(best)}}, {"_id": 0, "chat_id": 1, "title": 1, "created_at": 1}
+    ).to_list()
+    chats_by_id = {chat["chat_id"]: chat for chat in chats}
+    return [
+        ChatSearchHit(
+            chat_id=chat_id,
+            title=chats_by_id[chat_id].get("title", "Untitled"),
+            created_at=_format_created_at(chats_by_id[chat_id]["created_at"]),
+            snippet=_snippet(content, []),
+            score=score,
+        )
+        for chat_id, (content, score) in best.items()
+        if chat_id in chats_by_id
+    ]
+
+
+async def index_chat_messages(user_id: str, chat_id: str, messages: List[dict]):
+    """Queue embedding of newly saved messages for semantic search.
+
+    Called from the save job on a pipeline worker, so it never waits for room
+    in the queue; messages dropped when it is full are not searchable semantically.
+    """
+    if not semantic_search_available():
+        return
+    contents = [msg["content"] for msg in messages if msg["role"] != "system" and msg["content"].strip()]
+    if contents:
+        await background_jobs.submit_nowait(f"embed-chat:{chat_id}", _embed_job(user_id, chat_id, contents))
+
+
+def _embed_job(user_id: str, chat_id: str, contents: List[str]):
+    async def job():
+        vectors = await embedding_batcher.embed(contents)
+        await chat_embeddings_collection.insert_many([
+            {
+                "user_id": user_id,
+                "chat_id": chat_id,
+                "model": settings.EMBEDDING_MODEL,
+                "content": content[:SNIPPET_CHARS],
+                "vector": vector,
+            }
+            for content, vector in zip(contents, vectors)
+        ])
+        index = vector_indexes.get(user_id)
+        if index is not None:
+            index.add([(chat_id, content[:SNIPPET_CHARS]) for content in contents], vectors)
+
+    return job
+
+
+async def delete_chat_index(user_id: str, chat_id: str):
+    await chat_embeddings_collection.delete_many({"user_id": user_id, "chat_id": chat_id})
+    index = vector_indexes.get(user_id)
+    if index is not None:
+        index.remove(lambda id_: id_[0] == chat_id)
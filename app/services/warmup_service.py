@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from app.config import settings
+from app.services.ollama_service import get_loaded_ollama_models, preload_ollama_model
+from app.services.metrics_service import Gauge
+
+
+class ModelWarmup:
+    """Preloads models at startup and keeps recently used ones in memory.
+
+    A model used within HOT_MODEL_IDLE_SECONDS is requested with the long
+    HOT_MODEL_KEEP_ALIVE; once it goes cold its keep-alive is reset to
+    OLLAMA_KEEP_ALIVE so Ollama unloads it normally.
+    """
+
+    def __init__(self, models: List[str], hot_keep_alive: str, idle_seconds: float):
+        self.models = models
+        self.hot_keep_alive = hot_keep_alive
+        self.idle_seconds = idle_seconds
+        self.load_times: Dict[str, float] = {}
+        self._last_used: Dict[str, float] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def touch(self, model: str):
+        self._last_used[model] = time.monotonic()
+
+    def is_hot(self, model: str) -> bool:
+        last_used = self._last_used.get(model)
+        return last_used is not None and time.monotonic() - last_used < self.idle_seconds
+
+    def keep_alive_for(self, model: str) -> str:
+        return self.hot_keep_alive if self.is_hot(model) else settings.OLLAMA_KEEP_ALIVE
+
+    async def start(self):
+        for model in self.models:
+            self.touch(model)
+        # Warm up in the background so startup is not blocked by model loading
+        self._tasks = [
+            asyncio.create_task(self._warm_all()),
+            asyncio.create_task(self._cool_down()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _warm_all(self):
+        for model in self.models:
+            try:
+                load_time = await preload_ollama_model(model, self.hot_keep_alive)
+                self.load_times[model] = load_time
+                logging.info(f"Warmed up model {model} in {load_time:.2f}s")
+            except Exception as e:
+                logging.warning(f"Failed to warm up model {model}: {str(e)}")
+
+    async def _cool_down(self):
+        while True:
+            await asyncio.sleep(max(self.idle_seconds / 4, 1.0))
+            cold = [model for model in self._last_used if not self.is_hot(model)]
+            if not cold:
+                continue
+            try:
+                loaded = set(await get_loaded_ollama_models())
+                for model in cold:
+                    del self._last_used[model]
+                    if model in loaded or f"{model}:latest" in loaded:
+                        await preload_ollama_model(model, settings.OLLAMA_KEEP_ALIVE)
+                        logging.info(f"Model {model} went cold, keep-alive reset to {settings.OLLAMA_KEEP_ALIVE}")
+            except Exception as e:
+                logging.warning(f"Failed to release cold models: {str(e)}")
+
+
+model_warmup = ModelWarmup(
+    [name.strip() for name in (settings.WARMUP_MODELS or settings.DEFAULT_MODEL).split(",") if name.strip()]
+    if settings.WARMUP_ENABLED else [],
+    settings.HOT_MODEL_KEEP_ALIVE,
+    settings.HOT_MODEL_IDLE_SECONDS,
+)
+
+Gauge(
+    "model_warmup_load_seconds", "Time taken to load each model at startup warmup", ["model"],
+    collect=lambda: {(model,): load_time for model, load_time in model_warmup.load_times.items()},
+)
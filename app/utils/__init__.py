@@ -1,5 +1,16 @@
-__all__ = ["generate_id", "get_current_time", "format_size"]
+__all__ = ["generate_id", "get_current_time", "format_size", "parse_model_limits", "LRUCache", "Broadcast", "SingleFlight", "replay_text", "coalesce", "FrameWriter", "negotiate_frame_mode", "FRAME_JSON", "VectorIndex", "MmapVectorStore"]
 
 from .utils import generate_id
 from .utils import get_current_time
-from .utils import format_size
\ No newline at end of file
+from .utils import format_size
+from .utils import parse_model_limits
+from .cache import LRUCache
+from .streaming import Broadcast
+from .streaming import SingleFlight
+from .streaming import replay_text
+from .streaming import coalesce
+from .frames import FrameWriter
+from .frames import negotiate_frame_mode
+from .frames import FRAME_JSON
+from .vector_index import VectorIndex
+from .vector_index import MmapVectorStore
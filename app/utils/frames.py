@@ -0,0 +1,61 @@
+import json
+from typing import Any, Dict
+
+from fastapi import WebSocket
+
+try:
+    import msgpack
+except ImportError:  # Optional: the msgpack frame mode is unavailable without it
+    msgpack = None
+
+FRAME_JSON = "json"
+FRAME_MSGPACK = "msgpack"
+FRAME_BINARY = "binary"
+
+# Type byte of binary frames. WebSocket messages are already length delimited,
+# so the payload follows the type byte directly.
+BINARY_EVENT = 0x00  # UTF-8 JSON event
+BINARY_CHUNK = 0x01  # UTF-8 text of a streamed chunk
+
+
+def negotiate_frame_mode(requested: str | None) -> str:
+    """Frame mode for a connection, falling back to JSON when the request cannot be served."""
+    if requested == FRAME_BINARY:
+        return FRAME_BINARY
+    if requested == FRAME_MSGPACK and msgpack is not None:
+        return FRAME_MSGPACK
+    return FRAME_JSON
+
+
+class FrameWriter:
+    """Encodes chat events for one WebSocket in its negotiated frame mode.
+
+    `json` sends text frames as before. `msgpack` sends each event as a
+    MessagePack map. `binary` sends chunks as raw UTF-8 behind a type byte and
+    other events as JSON behind a type byte. Both compact modes omit the
+    repeated full text from the `complete` event.
+    """
+
+    def __init__(self, websocket: WebSocket, mode: str = FRAME_JSON):
+        self.websocket = websocket
+        self.mode = mode
+
+    @property
+    def compact(self) -> bool:
+        return self.mode != FRAME_JSON
+
+    async def send(self, event: Dict[str, Any]):
+        if self.mode == FRAME_MSGPACK:
+            await self.websocket.send_bytes(msgpack.packb(event))
+        elif self.mode == FRAME_BINARY:
+            await self.websocket.send_bytes(
+                bytes((BINARY_EVENT,)) + json.dumps(event, separators=(",", ":")).encode()
+            )
+        else:
+            await self.websocket.send_json(event)
+
+    async def chunk(self, text: str):
+        if self.mode == FRAME_BINARY:
+            await self.websocket.send_bytes(bytes((BINARY_CHUNK,)) + text.encode())
+        else:
+            await self.send({"status": "streaming", "chunk": text})
@@ -0,0 +1,164 @@
+import asyncio
+import contextlib
+from typing import AsyncIterator, Callable, Dict, Hashable, List
+
+
+class Broadcast:
+    """Fans one async stream of chunks out to any number of subscribers.
+
+    Chunks are buffered, so a subscriber joining late first replays what was
+    already produced. The source runs once, in its own task, and is cancelled
+    when the last subscriber leaves before it has finished.
+    """
+
+    def __init__(self, source: AsyncIterator[str], on_done: Callable[[], None] | None = None):
+        self._source = source
+        self._on_done = on_done
+        self._chunks: List[str] = []
+        self._error: BaseException | None = None
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.subscribers = 0
+        self.done = False
+
+    async def _pump(self):
+        try:
+            async for chunk in self._source:
+                self._chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            self._error = asyncio.CancelledError()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.done = True
+            self._notify()
+            if self._on_done:
+                self._on_done()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        try:
+            index = 0
+            while True:
+                while index < len(self._chunks):
+                    yield self._chunks[index]
+                    index += 1
+                if self.done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                # Nobody is listening any more; later callers must start afresh.
+                # Waiting for the source to unwind releases what it holds
+                # (connections, scheduler slots) before the caller moves on.
+                self.done = True
+                self._task.cancel()
+                await asyncio.wait((self._task,))
+
+
+class SingleFlight:
+    """Shares one in-flight stream between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Broadcast] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def subscribe(self, key: Hashable, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Join the stream running for `key`, starting it with `factory` if there is none."""
+        flight = self._flights.get(key)
+        if flight is None or flight.done:
+            flight = Broadcast(factory(), on_done=lambda: self._finish(key, flight))
+            self._flights[key] = flight
+        return flight.subscribe()
+
+    def _finish(self, key: Hashable, flight: Broadcast):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+async def replay_text(text: str, chunk_size: int = 64) -> AsyncIterator[str]:
+    """Stream stored text back in chunks, as if it were being generated."""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+
+async def coalesce(
+    source: AsyncIterator[str], max_bytes: int, max_tokens: int, max_latency: float
+) -> AsyncIterator[str]:
+    """Merge small chunks into larger frames.
+
+    The first chunk is passed through at once. Later chunks are buffered until
+    the buffer holds `max_bytes` bytes or `max_tokens` chunks, or its oldest
+    chunk has waited `max_latency` seconds, whichever comes first. If the
+    source fails, the buffered text is yielded before the error is re-raised.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = source.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline: float | None = None
+    pending: asyncio.Future | None = None
+    try:
+        chunk = await anext(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+        while True:
+            if deadline is None and pending is None:
+                # Nothing buffered, so there is no timer to race against
+                chunk = await anext(iterator, None)
+                if chunk is None:
+                    break
+            else:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(iterator, None))
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                done, _ = await asyncio.wait((pending,), timeout=timeout)
+                if not done:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    size = 0
+                    deadline = None
+                    continue
+                task, pending = pending, None
+                chunk = task.result()
+                if chunk is None:
+                    break
+
+            buffer.append(chunk)
+            size += len(chunk.encode())
+            if deadline is None:
+                deadline = loop.time() + max_latency
+            if size >= max_bytes or len(buffer) >= max_tokens:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+                deadline = None
+
+        if buffer:
+            yield "".join(buffer)
+    except Exception:
+        # Text the source produced before failing still reaches the client
+        if buffer:
+            yield "".join(buffer)
+        raise
+    finally:
+        if pending is not None:
+            pending.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await pending
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
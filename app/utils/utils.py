@@ -1,6 +1,7 @@
 import random
 import string
 from datetime import datetime, timezone
+from typing import Dict
 
 
 def generate_id(length: int = 8) -> str:
@@ -24,6 +25,16 @@ def format_size(size_bytes):
     return f"{gb:.2f} GB"
 
 
+def parse_model_limits(spec: str) -> Dict[str, int]:
+    """Parse a "model=limit" list such as "llama3=4,mistral=2"."""
+    limits = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if sep and name.strip() and value.strip().isdigit():
+            limits[name.strip()] = max(int(value), 1)
+    return limits
+
+
 if __name__ == "__main__":
     print(generate_id())
     print(get_current_time())
\ No newline at end of file
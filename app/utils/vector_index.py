@@ -0,0 +1,242 @@
+import json
+import os
+from typing import Callable, Hashable, List, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: appends are then only safe from a single process
+    fcntl = None
+
+try:
+    import numpy as np
+except ImportError:  # Optional: vector search is unavailable without it
+    np = None
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """Exact cosine-similarity search over an in-memory float32 matrix.
+
+    Vectors are normalized on insert, so a query is one matrix-vector product
+    followed by a partial sort. Rows live in a buffer that doubles when full,
+    so adding vectors one batch at a time stays amortized O(1) per row.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("Vector search requires numpy")
+        self.ids: List[Hashable] = []
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: Sequence[Hashable], vectors: Sequence[Sequence[float]]):
+        if not ids:
+            return
+        rows = _normalize(np.asarray(vectors, dtype=np.float32))
+        size = len(self.ids)
+        if self._matrix is None:
+            self._matrix = np.empty((max(len(ids), 64), rows.shape[1]), dtype=np.float32)
+        elif size + len(ids) > self._matrix.shape[0]:
+            grown = np.empty((max(2 * self._matrix.shape[0], size + len(ids)), rows.shape[1]), dtype=np.float32)
+            grown[:size] = self._matrix[:size]
+            self._matrix = grown
+        self._matrix[size:size + len(ids)] = rows
+        self.ids.extend(ids)
+
+    def remove(self, predicate: Callable[[Hashable], bool]):
+        keep = [row for row, id_ in enumerate(self.ids) if not predicate(id_)]
+        if len(keep) == len(self.ids):
+            return
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self.ids = [self.ids[row] for row in keep]
+
+    def search(self, vector: Sequence[float], k: int) -> List[Tuple[Hashable, float]]:
+        """The `k` nearest ids with their cosine similarity, best first."""
+        if not self.ids:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        scores = self._matrix[:len(self.ids)] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[row], float(scores[row])) for row in top]
+
+
+def _kmeans(sample, lists: int, iterations: int = 10, seed: int = 0):
+    """Spherical k-means: centroids of unit vectors, compared by dot product."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        counts = np.bincount(labels, minlength=lists)
+        # Sum each cluster's members in one pass; empty clusters keep their centroid
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)))[filled]
+        sums = np.add.reduceat(sample[np.argsort(labels, kind="stable")], starts, axis=0)
+        centroids[filled] = _normalize(sums)
+    return centroids
+
+
+class MmapVectorStore:
+    """Append-only vector matrix on disk with a persisted IVF index.
+
+    Rows are unit float32 vectors in `vectors.f32`, read through a memory map
+    so the matrix never has to fit in memory. The IVF index clusters the rows
+    with k-means and stores each cluster's rows contiguously; a query scores
+    the centroids, then only the rows of the `probes` closest clusters plus
+    the rows appended since the last build. Below `min_index_rows` rows the
+    whole matrix is scanned instead.
+
+    Appends hold an exclusive lock on the vectors file and number their rows
+    from its actual size, so several processes, or several instances over the
+    same directory, can append safely. `refresh` picks up their rows and index
+    builds.
+
+    Methods block on disk I/O and NumPy work; call them from a worker thread.
+    """
+
+    def __init__(self, directory: str, min_index_rows: int = 10000):
+        if np is None:
+            raise RuntimeError("Vector search requires numpy")
+        self.directory = directory
+        self.min_index_rows = min_index_rows
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._index_path = os.path.join(directory, "ivf.npz")
+        self.dim: int | None = None
+        self._matrix = None
+        # (centroids, order, offsets, rows), replaced as a whole so concurrent
+        # searches never see parts of two different builds
+        self._index = None
+        self._index_mtime = None
+        self.refresh()
+
+    @property
+    def indexed_rows(self) -> int:
+        return self._index[3] if self._index else 0
+
+    @property
+    def count(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    def refresh(self) -> int:
+        """Map rows and load an index written since the last call; return the row count."""
+        if self.dim is None:
+            self._load_dim()
+        if self.dim is not None:
+            self._map()
+        try:
+            mtime = os.stat(self._index_path).st_mtime_ns
+        except FileNotFoundError:
+            return self.count
+        if mtime != self._index_mtime:
+            with np.load(self._index_path) as index:
+                self._index = (index["centroids"], index["order"], index["offsets"], int(index["rows"]))
+            self._index_mtime = mtime
+        return self.count
+
+    def _load_dim(self):
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+    def _map(self):
+        try:
+            rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+        except FileNotFoundError:
+            return
+        if rows != self.count:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def append(self, vectors: Sequence[Sequence[float]]) -> int:
+        """Store vectors and return the row number of the first one."""
+        rows = _normalize(np.asarray(vectors, dtype=np.float32))
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._vectors_path, "ab") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Another process may have created the store or appended since it was mapped
+                self._load_dim()
+                if self.dim is None:
+                    self.dim = rows.shape[1]
+                    temporary = self._meta_path + ".tmp"
+                    with open(temporary, "w", encoding="utf-8") as meta:
+                        json.dump({"dim": self.dim}, meta)
+                    os.replace(temporary, self._meta_path)
+                elif rows.shape[1] != self.dim:
+                    raise ValueError(f"Expected vectors of dimension {self.dim}, got {rows.shape[1]}")
+
+                row_bytes = 4 * self.dim
+                first_row = f.seek(0, os.SEEK_END) // row_bytes
+                # Drop a partial row left by an interrupted write; appends always go to the end
+                f.truncate(first_row * row_bytes)
+                f.write(rows.tobytes())
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        self._map()
+        return first_row
+
+    @property
+    def needs_index(self) -> bool:
+        """Whether enough rows were appended since the last build to rebuild the index."""
+        return self.count >= self.min_index_rows and self.count >= 2 * self.indexed_rows
+
+    def build_index(self, lists: int | None = None, sample_per_list: int = 64):
+        matrix = self._matrix
+        rows = matrix.shape[0]
+        lists = lists or max(int(np.sqrt(rows)), 1)
+        rng = np.random.default_rng(0)
+        sample = np.asarray(matrix[np.sort(rng.choice(rows, min(rows, lists * sample_per_list), replace=False))])
+        centroids = _kmeans(sample, lists)
+
+        labels = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, 65536):
+            labels[start:start + 65536] = np.argmax(matrix[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=lists)))).astype(np.int64)
+
+        # Write then rename, so readers never see a half-written index
+        temporary = self._index_path + ".tmp.npz"
+        np.savez(temporary, centroids=centroids, order=order, offsets=offsets, rows=rows)
+        os.replace(temporary, self._index_path)
+        self._index = (centroids, order, offsets, rows)
+        self._index_mtime = os.stat(self._index_path).st_mtime_ns
+
+    def search(self, vector: Sequence[float], k: int, probes: int = 8) -> List[Tuple[int, float]]:
+        """The `k` nearest rows with their cosine similarity, best first."""
+        matrix, index = self._matrix, self._index
+        if matrix is None:
+            return []
+        query = _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+
+        if index is None:
+            candidates = None
+            scores = matrix @ query
+        else:
+            centroids, order, offsets, indexed_rows = index
+            probes = min(probes, len(centroids))
+            nearest = np.argpartition(-(centroids @ query), probes - 1)[:probes]
+            candidates = np.concatenate(
+                [order[offsets[c]:offsets[c + 1]] for c in nearest]
+                + [np.arange(indexed_rows, matrix.shape[0])]
+            )
+            candidates.sort()  # Sequential reads from the memory map
+            scores = matrix[candidates] @ query
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        rows = top if candidates is None else candidates[top]
+        return [(int(row), float(score)) for row, score in zip(rows, scores[top])]
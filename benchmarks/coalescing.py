@@ -0,0 +1,82 @@
+"""Frames per second and latency of streamed chunk framing, old and new.
+
+A fake token source yields `--tokens` tokens `--spacing` milliseconds apart
+into a consumer that stands in for the WebSocket. `old` is the previous
+pipeline: tokens joined three at a time, then a 10 ms sleep after every
+frame. `new` is app.utils.coalesce with the STREAM_FLUSH_* settings.
+
+    python -m benchmarks.coalescing --scenario 500:0 500:1 200:20
+"""
+import argparse
+import asyncio
+import time
+from typing import AsyncIterator
+
+import benchmarks.common  # noqa: F401  Sets the settings placeholders before app is imported
+
+from app.config import settings
+from app.utils import coalesce
+
+TOKEN = "tok "
+
+
+async def tokens(count: int, spacing: float) -> AsyncIterator[str]:
+    for _ in range(count):
+        if spacing:
+            await asyncio.sleep(spacing)
+        yield TOKEN
+
+
+async def old_pipeline(source: AsyncIterator[str]) -> AsyncIterator[str]:
+    parts = []
+    async for token in source:
+        parts.append(token)
+        if len(parts) >= 3:
+            yield "".join(parts)
+            parts.clear()
+            await asyncio.sleep(0.01)
+    if parts:
+        yield "".join(parts)
+
+
+def new_pipeline(source: AsyncIterator[str]) -> AsyncIterator[str]:
+    return coalesce(
+        source, settings.STREAM_FLUSH_BYTES, settings.STREAM_FLUSH_TOKENS, settings.STREAM_FLUSH_INTERVAL_MS / 1000
+    )
+
+
+async def measure(pipeline, count: int, spacing: float) -> str:
+    started = time.perf_counter()
+    first = None
+    frames = 0
+    received = 0
+    async for frame in pipeline(tokens(count, spacing)):
+        if first is None:
+            first = time.perf_counter() - started
+        frames += 1
+        received += len(frame) // len(TOKEN)
+    total = time.perf_counter() - started
+    assert received == count
+    return (
+        f"{frames:5} frames  {frames / total:8.1f} frames/s  "
+        f"first frame {first * 1000:7.1f} ms  total {total * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--scenario", nargs="+", default=["500:0", "500:1", "200:20"],
+        help="TOKENS:SPACING_MS pairs",
+    )
+    args = parser.parse_args()
+
+    for scenario in args.scenario:
+        count, spacing = scenario.split(":")
+        print(f"{count} tokens, {spacing} ms apart")
+        for name, pipeline in [("old", old_pipeline), ("new", new_pipeline)]:
+            print(f"  {name}  {asyncio.run(measure(pipeline, int(count), float(spacing) / 1000))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Shared helpers of the benchmark scripts; import before anything from app.
+
+Run a benchmark from the repository root, e.g. `python -m benchmarks.loop_lag`.
+"""
+import os
+from typing import Sequence
+
+# Settings are read at import time; benchmarks only need placeholders for the required ones
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def summarize_ms(values: Sequence[float]) -> str:
+    """p50/p99/max of durations given in seconds, formatted in milliseconds."""
+    return (
+        f"p50 {percentile(values, 50) * 1000:7.2f} ms  "
+        f"p99 {percentile(values, 99) * 1000:7.2f} ms  "
+        f"max {max(values, default=0) * 1000:7.2f} ms"
+    )
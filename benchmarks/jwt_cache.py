@@ -0,0 +1,58 @@
+"""Per-request cost of token verification with and without the decoded-token cache.
+
+Times a full jwt.decode, decode_token on a cold cache, and decode_token and
+the get_current_user dependency on a warm one.
+
+    python -m benchmarks.jwt_cache --number 20000
+"""
+import argparse
+import asyncio
+import timeit
+
+import benchmarks.common  # noqa: F401  Sets the settings placeholders before app is imported
+
+import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.config import settings
+from app.middlewares.auth import decode_token, decoded_tokens, get_current_user
+from app.services.auth_service import create_access_token
+
+
+def per_call_us(statement, number: int, setup=None) -> float:
+    runs = timeit.repeat(statement, setup=setup or (lambda: None), number=number, repeat=5)
+    return min(runs) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    args = parser.parse_args()
+
+    token = create_access_token({"user_id": "65f0c0ffee0123456789abcd"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    loop = asyncio.new_event_loop()
+
+    def cold():
+        decoded_tokens.clear()
+        decode_token(token)
+
+    results = {
+        "jwt.decode": per_call_us(
+            lambda: jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]), args.number
+        ),
+        "decode_token, cold cache": per_call_us(cold, args.number),
+        "decode_token, warm cache": per_call_us(lambda: decode_token(token), args.number, setup=cold),
+        "get_current_user, cold cache": per_call_us(
+            lambda: (decoded_tokens.clear(), loop.run_until_complete(get_current_user(credentials))), args.number
+        ),
+        "get_current_user, warm cache": per_call_us(
+            lambda: loop.run_until_complete(get_current_user(credentials)), args.number, setup=cold
+        ),
+    }
+    for name, micros in results.items():
+        print(f"{name:30} {micros:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
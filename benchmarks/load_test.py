@@ -0,0 +1,79 @@
+"""HTTP load test of the Mongo-backed endpoints against a running server.
+
+Registers a throwaway user, then `--clients` concurrent clients each send
+`--requests` authenticated requests, alternating between the chat list
+and /auth/me, which both read MongoDB on every call. Reports throughput,
+errors and latency percentiles. Run it against a deployment of each
+version to compare them, e.g. with the server started by
+`uvicorn app.main:app --workers 1`:
+
+    python -m benchmarks.load_test --url http://localhost:8000 --clients 500
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks.common import summarize_ms
+
+import httpx
+
+ENDPOINTS = ["/api/v1/chat/?limit=20", "/api/v1/auth/me"]
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    name = f"load-{uuid.uuid4().hex[:12]}"
+    response = await client.post("/api/v1/auth/register", json={
+        "username": name, "email": f"{name}@example.com", "password": name, "confirm_password": name,
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def virtual_client(client: httpx.AsyncClient, headers: dict, requests: int, latencies: list, errors: list):
+    for index in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await client.get(ENDPOINTS[index % len(ENDPOINTS)], headers=headers)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url: str, clients: int, requests: int, timeout: float):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        headers = {"Authorization": f"Bearer {await register(client)}"}
+        # One warm-up round so connection setup is not measured
+        await asyncio.gather(*(virtual_client(client, headers, 1, [], []) for _ in range(clients)))
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            virtual_client(client, headers, requests, latencies, errors) for _ in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+
+    total = clients * requests
+    print(f"{clients} clients x {requests} requests in {elapsed:.2f} s: {total / elapsed:.0f} req/s, {len(errors)} errors")
+    if errors:
+        print(f"  first errors: {errors[:5]}")
+    print(f"  latency {summarize_ms(latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.clients, args.requests, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Requests per second through the request logger, old and new.
+
+A small Starlette app with a GET and a JSON POST route is called directly
+as an ASGI app: without logging, behind the previous BaseHTTPMiddleware
+logger (copied below as it was) and behind the current pure ASGI
+LoggingMiddleware with its default sampling and body cap. Both loggers
+write to os.devnull, so terminal speed does not decide the result.
+
+    python -m benchmarks.logging_middleware --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import benchmarks.common  # noqa: F401  Sets the settings placeholders before app is imported
+
+from fastapi import Request, Response
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middlewares import logger as logger_module
+from app.middlewares.logger import LoggingMiddleware
+
+devnull = open(os.devnull, "w")
+legacy_logger = logging.getLogger("benchmark.legacy")
+legacy_logger.addHandler(logging.StreamHandler(devnull))
+legacy_logger.setLevel(logging.INFO)
+legacy_logger.propagate = False
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The logger this repository used before the pure ASGI one."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(time.time())
+        await self._log_request(request, request_id)
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        await self._log_response(response, request_id, process_time)
+        return response
+
+    async def _log_request(self, request: Request, request_id: str):
+        headers = dict(request.headers)
+        if "authorization" in headers:
+            headers["authorization"] = f"{headers['authorization'][0:15]}...MASKED..."
+        body = None
+        if request.method in ["POST", "PUT", "PATCH"]:
+            receive_ = await request._receive()
+
+            async def receive():
+                return receive_
+
+            request._receive = receive
+            try:
+                body_bytes = receive_.get("body", b"")
+                if body_bytes:
+                    body = json.loads(body_bytes)
+            except json.JSONDecodeError:
+                body = "Unable to parse request body"
+        legacy_logger.info(f"🌐 REQUEST [{request_id}] - {request.method} {request.url.path}")
+        legacy_logger.info(f"📃 HEADERS [{request_id}] - {headers}")
+        if body:
+            legacy_logger.info(f"🅱️ BODY [{request_id}] - {body}")
+
+    async def _log_response(self, response: Response, request_id: str, process_time: float):
+        legacy_logger.info(f"📨 RESPONSE [{request_id}] - Status: {response.status_code}, Time: {process_time:.4f}s")
+        legacy_logger.info(f"📨 RESPONSE HEADERS [{request_id}] - {dict(response.headers)}")
+
+
+async def get_item(request):
+    return JSONResponse({"chats": [{"chat_id": str(i), "title": "Chat"} for i in range(20)]})
+
+
+async def post_item(request):
+    payload = await request.json()
+    return JSONResponse({"response": payload["message"]["content"]})
+
+
+def build_app(middleware):
+    app = Starlette(routes=[Route("/items", get_item), Route("/items", post_item, methods=["POST"])])
+    if middleware:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call(app, method: str, body: bytes) -> int:
+    """Send one request straight to the ASGI app, the way a server would."""
+    headers = [(b"host", b"benchmark"), (b"authorization", b"Bearer abc.def.ghi")]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": "/items", "raw_path": b"/items", "query_string": b"",
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 50000), "server": ("benchmark", 80),
+    }
+    finished = asyncio.Event()
+    sent_body = False
+    status = 0
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return status
+
+
+async def measure(app, requests: int, concurrency: int) -> float:
+    body = json.dumps({"message": {"role": "user", "content": "Hello " * 50}, "model": "llama3.2"}).encode()
+
+    async def worker(count: int):
+        for index in range(count):
+            status = await (call(app, "POST", body) if index % 2 else call(app, "GET", b""))
+            assert status == 200, status
+
+    await worker(100)  # Warm up
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    return (requests // concurrency) * concurrency / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    logger_module._console_handler.setStream(devnull)
+    logger_module.log_listener.start()
+    try:
+        for name, middleware in [
+            ("no logging", None),
+            ("BaseHTTPMiddleware (old)", LegacyLoggingMiddleware),
+            ("pure ASGI (new)", LoggingMiddleware),
+        ]:
+            rate = asyncio.run(measure(build_app(middleware), args.requests, args.concurrency))
+            print(f"{name:26} {rate:8.0f} req/s")
+    finally:
+        logger_module.log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Event loop lag while N chat streams run concurrently.
+
+Streams come from the fake Ollama server of the test suite, running on its
+own thread. `async` consumes them through stream_chat_to_ollama and the
+shared AsyncClient. `sync` reproduces the previous engine, which iterated
+ollama.chat(stream=True) on the event loop thread. A probe task sleeps
+PROBE_INTERVAL at a time and records how late it wakes up.
+
+    python -m benchmarks.loop_lag --streams 1 10 50
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks.common import summarize_ms
+
+import ollama
+
+from app.services import ollama_service
+from tests.fake_ollama import FakeOllama
+
+PROBE_INTERVAL = 0.005
+MESSAGES = [{"role": "user", "content": "Tell me a story"}]
+
+
+def start_fake_ollama(tokens: int, interval: float) -> str:
+    """Run the fake server on its own loop, so a blocked benchmark loop cannot stall it."""
+    loop = asyncio.new_event_loop()
+    server = FakeOllama(tokens=tokens, interval=interval)
+    url = loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return url
+
+
+async def consume_async(host: str):
+    async for _ in ollama_service.stream_chat_to_ollama(MESSAGES, "fake-model"):
+        pass
+
+
+async def consume_sync(host: str):
+    # The previous engine: every next() is a blocking socket read on the loop thread
+    for _ in ollama.Client(host=host).chat(model="fake-model", messages=MESSAGES, stream=True):
+        await asyncio.sleep(0)
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def run(mode: str, streams: int, host: str):
+    ollama_service.async_client = ollama.AsyncClient(host=host)
+    consume = consume_async if mode == "async" else consume_sync
+    lags, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(consume(host) for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    print(f"{mode:5} {streams:4} streams  {elapsed:6.2f} s  loop lag {summarize_ms(lags)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens per stream")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between tokens")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    args = parser.parse_args()
+
+    host = start_fake_ollama(args.tokens, args.interval)
+    for streams in args.streams:
+        for mode in args.modes:
+            asyncio.run(run(mode, streams, host))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Retrieval benchmark: vector store over a large synthetic corpus, and batched embedding.
+
+Builds an MmapVectorStore of `--rows` clustered unit vectors in a scratch
+directory and reports append throughput, exhaustive query latency, IVF
+build time, and IVF query latency and recall@10 for several probe counts.
+Recall is measured against the exhaustive results for the same queries.
+
+Embedding throughput goes through the EmbeddingBatcher, with
+`--embed-callers` concurrent callers embedding `--embed-texts` distinct
+chunks. It uses the fake Ollama server unless `--ollama-host` points at a
+real one, in which case EMBEDDING_MODEL must be pulled there.
+
+    python -m benchmarks.vector_store --rows 1000000 --dim 384
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+
+import benchmarks.common  # noqa: F401  Sets the settings placeholders before app is imported
+
+import numpy as np
+import ollama
+
+from app.config import settings
+from app.services import ollama_service
+from app.services.embedding_service import EmbeddingBatcher
+from app.utils import MmapVectorStore
+from tests.fake_ollama import FakeOllama
+
+BLOCK_ROWS = 100_000
+
+
+def synthetic_blocks(rows: int, dim: int, clusters: int, seed: int = 0):
+    """Blocks of vectors scattered around `clusters` random centres, as widely as the centres themselves."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    for start in range(0, rows, BLOCK_ROWS):
+        size = min(BLOCK_ROWS, rows - start)
+        labels = rng.integers(clusters, size=size)
+        yield centres[labels] + rng.normal(size=(size, dim)).astype(np.float32)
+
+
+def timed_queries(search, queries) -> tuple:
+    results, durations = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append([row for row, _ in search(query)])
+        durations.append(time.perf_counter() - started)
+    return results, durations
+
+
+def benchmark_store(rows: int, dim: int, clusters: int, queries: int, probes: list):
+    directory = tempfile.mkdtemp(prefix="vector-store-")
+    try:
+        store = MmapVectorStore(directory, min_index_rows=0)
+        started = time.perf_counter()
+        for block in synthetic_blocks(rows, dim, clusters):
+            store.append(block)
+        elapsed = time.perf_counter() - started
+        print(f"append: {rows} rows of {dim} dims in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)")
+
+        rng = np.random.default_rng(1)
+        sample = store._matrix[np.sort(rng.choice(rows, queries, replace=False))]
+        query_vectors = sample + 0.1 * rng.normal(size=sample.shape).astype(np.float32)
+
+        exact, durations = timed_queries(lambda q: store.search(q, 10), query_vectors)
+        print(f"exhaustive query: {np.median(durations) * 1000:.1f} ms median")
+
+        started = time.perf_counter()
+        store.build_index()
+        print(f"IVF build ({len(store._index[0])} lists): {time.perf_counter() - started:.1f} s")
+
+        for probe_count in probes:
+            found, durations = timed_queries(lambda q: store.search(q, 10, probe_count), query_vectors)
+            recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(found, exact)])
+            print(
+                f"IVF query, {probe_count:3} probes: {np.median(durations) * 1000:6.2f} ms median, "
+                f"recall@10 {recall:.2f}"
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+async def benchmark_embedding(host: str | None, texts: int, callers: int):
+    server = None
+    if host is None:
+        server = FakeOllama(dim=384)
+        host = await server.start()
+    ollama_service.async_client = ollama.AsyncClient(host=host)
+    batcher = EmbeddingBatcher(
+        settings.EMBEDDING_BATCH_SIZE, settings.EMBEDDING_BATCH_DELAY_MS / 1000, settings.EMBEDDING_CACHE_SIZE
+    )
+    chunks = [f"Chunk {index} of a long uploaded document. " * 20 for index in range(texts)]
+    per_caller = texts // callers
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            batcher.embed(chunks[index * per_caller:(index + 1) * per_caller]) for index in range(callers)
+        ))
+        elapsed = time.perf_counter() - started
+    finally:
+        if server:
+            await server.stop()
+
+    source = "fake Ollama" if server else host
+    calls = f", {len(server.embed_calls)} Ollama calls" if server else ""
+    print(
+        f"embedding via {source}: {per_caller * callers} texts from {callers} callers in {elapsed:.2f} s "
+        f"({per_caller * callers / elapsed:,.0f} texts/s{calls})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000, help="Clusters of the synthetic corpus")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--embed-texts", type=int, default=2000)
+    parser.add_argument("--embed-callers", type=int, default=20)
+    parser.add_argument("--ollama-host", default=None, help="Measure embedding against this Ollama server")
+    args = parser.parse_args()
+
+    benchmark_store(args.rows, args.dim, args.clusters, args.queries, args.probes)
+    asyncio.run(benchmark_embedding(args.ollama_host, args.embed_texts, args.embed_callers))
+
+
+if __name__ == "__main__":
+    main()
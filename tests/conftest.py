@@ -0,0 +1,5 @@
+import os
+
+# Settings are read at import time; tests only need placeholders for the required ones
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class FakeStream:
+    """One streamed /api/chat response of the fake server."""
+    sent: int = 0
+    closed_by_client: bool = False
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class FakeOllama:
+    """Minimal Ollama HTTP server for tests and benchmarks.
+
+    /api/chat streams `tokens` tokens, one every `interval` seconds, and
+    stops as soon as the client closes the connection, recording how many
+    tokens each stream sent. /api/embed returns deterministic vectors of
+    `dim` floats derived from each text, at most `max_embeddings` of them
+    per call when set. Every response closes its
+    connection, so concurrent requests never share one.
+    """
+
+    def __init__(
+        self, tokens: int = 1000, interval: float = 0.05, token: str = "a", dim: int = 64,
+        max_embeddings: int | None = None,
+    ):
+        self.tokens = tokens
+        self.interval = interval
+        self.token = token
+        self.dim = dim
+        self.max_embeddings = max_embeddings
+        self.streams: List[FakeStream] = []
+        self.embed_calls: List[int] = []
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            path = request_line.split()[1].decode()
+            payload = json.loads(body) if body else {}
+
+            if path == "/api/chat" and payload.get("stream", True):
+                await self._stream_chat(reader, writer, payload)
+            elif path == "/api/chat":
+                await self._respond(writer, self._chat_message(payload, self.token * self.tokens, done=True))
+            elif path == "/api/embed":
+                texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+                self.embed_calls.append(len(texts))
+                vectors = [self._vector(text) for text in texts[:self.max_embeddings]]
+                await self._respond(writer, {"model": payload["model"], "embeddings": vectors})
+            else:
+                await self._respond(writer, {"error": f"unknown path {path}"}, status="404 Not Found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, body: dict, status: str = "200 OK"):
+        data = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+    async def _stream_chat(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, payload: dict):
+        stream = FakeStream()
+        self.streams.append(stream)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+        )
+        # The client sends nothing more, so a read only completes when it hangs up
+        hangup = asyncio.ensure_future(reader.read(1))
+        try:
+            for index in range(self.tokens):
+                done = index == self.tokens - 1
+                self._write_chunk(writer, self._chat_message(payload, self.token, done))
+                await writer.drain()
+                stream.sent += 1
+                if not done:
+                    await asyncio.wait((hangup,), timeout=self.interval)
+                    if hangup.done():
+                        stream.closed_by_client = True
+                        return
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            stream.closed_by_client = True
+        finally:
+            hangup.cancel()
+            stream.finished.set()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, body: dict):
+        line = json.dumps(body).encode() + b"\n"
+        writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+
+    @staticmethod
+    def _chat_message(payload: dict, content: str, done: bool) -> dict:
+        message = {
+            "model": payload.get("model", ""),
+            "created_at": "2025-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        if done:
+            message.update(done_reason="stop", total_duration=1, load_duration=1, eval_count=1, eval_duration=1)
+        return message
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        return [(digest[i % len(digest)] - 127.5) / 127.5 for i in range(self.dim)]
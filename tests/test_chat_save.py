@@ -0,0 +1,79 @@
+import asyncio
+
+from app.services import chat_service, search_service
+from app.services.job_service import BackgroundJobPipeline, background_jobs_dropped
+
+
+class FakeChats:
+    """Stands in for chats_collection; each update waits until `release` is set."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.updates = []
+
+    async def update_one(self, query, update, upsert=False):
+        await self.release.wait()
+        self.updates.append((query, update))
+
+
+def test_save_does_not_wait_for_room_in_full_queue(monkeypatch):
+    async def run():
+        pipeline = BackgroundJobPipeline(workers=1, max_queue=1, max_retries=1, retry_delay=0)
+        chats = FakeChats()
+        monkeypatch.setattr(chat_service, "chats_collection", chats)
+        monkeypatch.setattr(search_service, "background_jobs", pipeline)
+        monkeypatch.setattr(search_service, "semantic_search_available", lambda: True)
+        await pipeline.start()
+
+        saved = asyncio.Event()
+
+        async def save():
+            messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+            await chat_service.save_chat_conversation(messages, "user", "chat", "model", turn_id="turn")
+            saved.set()
+
+        async def filler():
+            pass
+
+        # The only worker runs the save while the queue fills up behind it
+        await pipeline.submit("save-chat", save)
+        await asyncio.sleep(0)
+        await pipeline.submit("filler", filler)
+        dropped = background_jobs_dropped._values.get((), 0)
+        chats.release.set()
+        try:
+            await asyncio.wait_for(saved.wait(), 1)
+        finally:
+            await pipeline.stop(timeout=1)
+        return chats, dropped
+
+    chats, dropped_before = asyncio.run(run())
+
+    assert len(chats.updates) == 1
+    assert background_jobs_dropped._values[()] == dropped_before + 1
+
+
+def test_title_is_set_after_the_append_lands(monkeypatch):
+    async def run():
+        pipeline = BackgroundJobPipeline(workers=2, max_queue=10, max_retries=1, retry_delay=0)
+        chats = FakeChats()
+        chats.release.set()
+        monkeypatch.setattr(chat_service, "chats_collection", chats)
+        monkeypatch.setattr(chat_service, "background_jobs", pipeline)
+        monkeypatch.setattr(search_service, "semantic_search_available", lambda: False)
+
+        async def generate_chat_title(messages, keep_alive=None):
+            return "Greetings"
+
+        monkeypatch.setattr(chat_service, "generate_chat_title", generate_chat_title)
+        await pipeline.start()
+        messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+        await chat_service.queue_chat_save(messages, "user", "chat", "model", is_new_chat=True)
+        await pipeline.stop(timeout=1)
+        return chats
+
+    chats = asyncio.run(run())
+
+    [(_, append), (_, title)] = chats.updates
+    assert "$push" in append
+    assert title == {"$set": {"title": "Greetings"}}
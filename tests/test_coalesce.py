@@ -0,0 +1,21 @@
+import asyncio
+
+import pytest
+
+from app.utils import coalesce
+
+
+def test_buffered_text_is_flushed_before_source_error():
+    async def source():
+        for chunk in "abcd":
+            yield chunk
+        raise ConnectionError("stream broke")
+
+    async def run():
+        frames = []
+        with pytest.raises(ConnectionError):
+            async for frame in coalesce(source(), max_bytes=1024, max_tokens=100, max_latency=10):
+                frames.append(frame)
+        return frames
+
+    assert asyncio.run(run()) == ["a", "bcd"]
@@ -0,0 +1,29 @@
+import asyncio
+
+import ollama
+from fastapi import HTTPException
+
+from app.services import ollama_service
+from app.services.embedding_service import EmbeddingBatcher
+from tests.fake_ollama import FakeOllama
+
+
+def test_short_embeddings_response_fails_every_caller(monkeypatch):
+    async def run():
+        server = FakeOllama(max_embeddings=2)
+        url = await server.start()
+        monkeypatch.setattr(ollama_service, "async_client", ollama.AsyncClient(host=url))
+        try:
+            batcher = EmbeddingBatcher(max_batch=8, max_delay=0.01, cache_size=16)
+            results = await asyncio.wait_for(asyncio.gather(
+                batcher.embed(["one", "two"]), batcher.embed(["three"]), return_exceptions=True,
+            ), 5)
+            return batcher, results
+        finally:
+            await server.stop()
+
+    batcher, results = asyncio.run(run())
+
+    assert all(isinstance(result, HTTPException) for result in results)
+    assert batcher._in_flight == {}
+    assert len(batcher.cache) == 0
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from pymongo import AsyncMongoClient
+from pymongo.errors import PyMongoError
+
+from app import database
+from app.config import settings
+
+TEST_DATABASE = "chatbot_test"
+
+
+async def _collection_scans():
+    client = AsyncMongoClient(settings.MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        await client.close()
+        pytest.skip(f"MongoDB is not reachable at MONGO_URI: {e}")
+
+    # Indexes are created in a scratch database, never in the application's
+    database.db = client[TEST_DATABASE]
+    try:
+        await database.ensure_indexes()
+        return await database.verify_query_plans()
+    finally:
+        await client.drop_database(TEST_DATABASE)
+        await client.close()
+
+
+def test_hot_queries_use_an_index(monkeypatch):
+    monkeypatch.setattr(database, "db", database.db)
+
+    assert asyncio.run(_collection_scans()) == []
@@ -0,0 +1,90 @@
+import asyncio
+
+import ollama
+import pytest
+
+from app.config import settings
+from app.services import ollama_service
+from app.services.chat_service import create_chat_completion_stream
+from app.services.scheduler_service import scheduler
+from tests.fake_ollama import FakeOllama
+
+MODEL = "fake-model"
+
+
+class RecordingWebSocket:
+    """Stands in for a JSON-mode WebSocket and counts the streamed tokens it receives."""
+
+    def __init__(self):
+        self.events = []
+        self.tokens = 0
+        self._token_arrived = asyncio.Event()
+
+    async def send_json(self, event):
+        self.events.append(event)
+        if event["status"] == "streaming":
+            self.tokens += len(event["chunk"])
+            self._token_arrived.set()
+
+    async def wait_for_tokens(self, count: int):
+        while self.tokens < count:
+            self._token_arrived.clear()
+            await asyncio.wait_for(self._token_arrived.wait(), 5)
+
+
+async def _interrupt_after(monkeypatch, tokens: int, set_interrupt_event: bool):
+    server = FakeOllama(tokens=1000, interval=0.05)
+    url = await server.start()
+    monkeypatch.setattr(ollama_service, "async_client", ollama.AsyncClient(host=url))
+    try:
+        websocket = RecordingWebSocket()
+        interrupt_event = asyncio.Event()
+        task = asyncio.create_task(create_chat_completion_stream(
+            websocket, None, None, [{"role": "user", "content": "Tell me a long story"}], MODEL, interrupt_event,
+        ))
+        await websocket.wait_for_tokens(tokens)
+
+        # What the interrupt command does; a disconnect only cancels the task
+        if set_interrupt_event:
+            interrupt_event.set()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        [stream] = server.streams
+        await asyncio.wait_for(stream.finished.wait(), 1)
+        return websocket, stream
+    finally:
+        await server.stop()
+
+
+@pytest.mark.parametrize("single_flight", [False, True])
+@pytest.mark.parametrize("set_interrupt_event", [True, False], ids=["interrupt", "disconnect"])
+def test_cancelled_stream_stops_generation_within_one_chunk(monkeypatch, single_flight, set_interrupt_event):
+    monkeypatch.setattr(settings, "STREAM_SINGLE_FLIGHT", single_flight)
+
+    websocket, stream = asyncio.run(_interrupt_after(monkeypatch, 5, set_interrupt_event))
+
+    assert stream.closed_by_client
+    # At most the token in flight when the client hung up was generated past what it saw
+    assert websocket.tokens <= stream.sent <= websocket.tokens + 1
+    assert scheduler.queue_for(MODEL).active == 0
+    assert not any(event["status"] == "complete" for event in websocket.events)
+
+
+def test_completed_stream_reads_every_token(monkeypatch):
+    async def run():
+        server = FakeOllama(tokens=20, interval=0.001)
+        url = await server.start()
+        monkeypatch.setattr(ollama_service, "async_client", ollama.AsyncClient(host=url))
+        try:
+            websocket = RecordingWebSocket()
+            await create_chat_completion_stream(websocket, None, None, [{"role": "user", "content": "Hi"}], MODEL)
+            return websocket, server.streams[0]
+        finally:
+            await server.stop()
+
+    websocket, stream = asyncio.run(run())
+
+    assert stream.sent == 20 and not stream.closed_by_client
+    assert websocket.events[-1]["status"] == "complete"
+    assert websocket.events[-1]["message"] == "a" * 20